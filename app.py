@@ -1,5 +1,5 @@
 """
-Flask Audio Transcription and Analysis Application
+Quart Audio Transcription and Analysis Application
 
 This application provides:
 - Audio file upload and transcription using OpenAI Whisper
@@ -9,7 +9,8 @@ This application provides:
 - Bookmark generation with AI-powered comments
 
 Dependencies:
-- Flask with CORS support
+- Quart (async Flask API) with CORS support
+- httpx for non-blocking calls to Azure services
 - OpenAI Whisper for transcription
 - Azure Speech Service for real-time recognition
 - Azure OpenAI for chat and summarization
@@ -18,16 +19,31 @@ Dependencies:
 
 import os
 import json
+import asyncio
+import time
+import logging
 import uuid
+import socket
+import argparse
 import tempfile
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import whisper
 import markdown
-from flask import Flask, request, jsonify, render_template, send_from_directory
-from flask_cors import CORS
+from quart import Quart, g, request, jsonify, render_template, send_from_directory
+from quart_cors import cors
 from dotenv import load_dotenv
 from pydub import AudioSegment
 
+from utils.fingerprint import FingerprintIndex
+from utils.job_ledger import JobLedger
+from utils.metrics import Registry, SamplingProfiler
+from utils.scheduler import Lane, LaneSaturated, Scheduler
+from utils.segments import merge_refined_segments
+from utils.storage import StorageManager
+from utils.transcription import Transcriber
+
 
 # =============================================================================
 # Configuration and Setup
@@ -36,6 +52,13 @@ from pydub import AudioSegment
 # Load environment variables
 load_dotenv()
 
+# Logging Configuration
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO'),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 # Azure OpenAI Configuration
 AZURE_OPENAI_ENDPOINT = os.getenv('AZURE_OPENAI_ENDPOINT')
 AZURE_OPENAI_KEY = os.getenv('AZURE_OPENAI_KEY')
@@ -45,23 +68,166 @@ AZURE_OPENAI_API_VERSION = os.getenv('AZURE_OPENAI_API_VERSION', '2023-05-15')
 # Azure Speech Service Configuration
 SPEECH_KEY = os.getenv('AZURE_SPEECH_KEY')
 SPEECH_REGION = os.getenv('AZURE_SPEECH_REGION')
+SPEECH_ENDPOINT = os.getenv('AZURE_SPEECH_ENDPOINT')  # Overrides the regional endpoint, e.g. for load tests
 
-# Application Configuration
-UPLOAD_FOLDER = 'uploads'
-TRANSCRIPTION_FOLDER = 'transcriptions'
+# Application Configuration (point both folders at shared storage for multi-node setups)
+UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
+TRANSCRIPTION_FOLDER = os.getenv('TRANSCRIPTION_FOLDER', 'transcriptions')
 WHISPER_MODEL_SIZE = "base"  # Options: "tiny", "base", "small", "medium", "large"
-
-# Create Flask app
-app = Flask(__name__, static_folder='static', template_folder='templates')
-CORS(app)
+DRAFT_MODEL_SIZE = "tiny"  # Fast model for the first pass of progressive transcription
+FINGERPRINT_ENABLED = True  # Reuse transcripts of audio recurring across episodes
+FINGERPRINT_DB = os.path.join(TRANSCRIPTION_FOLDER, 'fingerprints.sqlite')
+STORAGE_DB = os.getenv('STORAGE_DB') or os.path.join(TRANSCRIPTION_FOLDER, 'storage.sqlite')
+UPLOAD_QUOTA_BYTES = int(os.getenv('UPLOAD_QUOTA_BYTES', '0'))  # 0 for no limit
+TRANSCRIPT_COLD_DAYS = float(os.getenv('TRANSCRIPT_COLD_DAYS', '30'))  # Idle days before compression
+
+# Scheduler Configuration: interactive routes (speech, commands, chat) and bulk
+# transcription run in separate lanes so a transcription backlog cannot starve them
+INTERACTIVE_CONCURRENCY = int(os.getenv('INTERACTIVE_CONCURRENCY', '200'))
+INTERACTIVE_MAX_QUEUE = int(os.getenv('INTERACTIVE_MAX_QUEUE', '100'))
+INTERACTIVE_QUEUE_TIMEOUT = float(os.getenv('INTERACTIVE_QUEUE_TIMEOUT', '2'))
+INTERACTIVE_RESERVED_CPUS = int(os.getenv('INTERACTIVE_RESERVED_CPUS', '1'))
+BULK_CONCURRENCY = int(os.getenv('BULK_CONCURRENCY', '1'))
+BULK_MAX_QUEUE = int(os.getenv('BULK_MAX_QUEUE', '4'))
+BULK_TORCH_THREADS = int(
+    os.getenv('BULK_TORCH_THREADS') or max(1, (os.cpu_count() or 1) - INTERACTIVE_RESERVED_CPUS)
+)
+
+# Distributed Transcription Configuration: in "distributed" mode /transcribe only
+# queues a job in a ledger on shared storage, and any worker node may claim it
+TRANSCRIPTION_MODE = os.getenv('TRANSCRIPTION_MODE', 'local')  # Options: "local", "distributed"
+JOB_LEDGER_PATH = os.getenv('JOB_LEDGER_PATH') or os.path.join(TRANSCRIPTION_FOLDER, 'jobs.sqlite')
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '60'))
+JOB_HEARTBEAT_INTERVAL = JOB_LEASE_SECONDS / 4
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+WORKER_POLL_INTERVAL = 2  # Seconds an idle worker waits before claiming again
+EMBEDDED_WORKERS = int(os.getenv('EMBEDDED_WORKERS', '0'))  # Worker threads inside the web server
+
+# Profiling Configuration: when enabled, stacks are sampled continuously and the
+# samples of requests slower than SLOW_REQUEST_SECONDS are written to PROFILE_FOLDER.
+# Profiles are process-wide: they hold every thread sampled while the request ran.
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', '0.005'))
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', '5'))
+PROFILER_WINDOW = SLOW_REQUEST_SECONDS * 10  # Requests slower than this keep their last part
+PROFILE_FOLDER = os.getenv('PROFILE_FOLDER', 'profiles')
+
+# Outbound HTTP Configuration: AI and speech calls share one async client, so
+# the connection limit bounds how many are in flight at once
+AZURE_HTTP_TIMEOUT = 30
+AZURE_MAX_CONNECTIONS = int(os.getenv('AZURE_MAX_CONNECTIONS', '200'))
+
+# Create Quart app (async Flask API, so waiting on Azure does not hold a thread)
+app = Quart(__name__, static_folder='static', template_folder='templates')
+app = cors(app)
+
+# Shared async HTTP client, opened and closed with the server. When a browser
+# disconnects, Quart cancels the request task, which aborts the pending call.
+http_client = None
 
 # Initialize Whisper model
 model = whisper.load_model(WHISPER_MODEL_SIZE)
 
+# Priority lanes for interactive and bulk work
+scheduler = Scheduler(
+    Lane('interactive', INTERACTIVE_CONCURRENCY, INTERACTIVE_MAX_QUEUE,
+         queue_timeout=INTERACTIVE_QUEUE_TIMEOUT),
+    Lane('bulk', BULK_CONCURRENCY, BULK_MAX_QUEUE,
+         torch_threads=BULK_TORCH_THREADS)
+)
+
+# Threads that run Whisper for /transcribe. Requests wait for a bulk slot in the
+# event loop and only then take one of these threads, so queued transcriptions
+# never occupy the default executor that interactive routes use via to_thread.
+whisper_executor = ThreadPoolExecutor(
+    max_workers=BULK_CONCURRENCY,
+    thread_name_prefix='whisper',
+    initializer=scheduler.lane('bulk').apply_thread_budget
+)
+
 # Create required directories
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(TRANSCRIPTION_FOLDER, exist_ok=True)
 
+# Sharded upload/transcript layout with access tracking, quotas and cold compression.
+# Audio is only evicted once its transcript is final.
+storage = StorageManager(
+    UPLOAD_FOLDER,
+    TRANSCRIPTION_FOLDER,
+    STORAGE_DB,
+    upload_quota_bytes=UPLOAD_QUOTA_BYTES,
+    cold_after_seconds=TRANSCRIPT_COLD_DAYS * 86400,
+    can_evict=lambda file_id: get_transcription_status(file_id) == 'final'
+)
+
+# Fingerprints of transcribed episodes, for reusing recurring segments
+fingerprint_index = FingerprintIndex(FINGERPRINT_DB) if FINGERPRINT_ENABLED else None
+
+# Shared queue of transcription jobs in distributed mode
+job_ledger = (
+    JobLedger(JOB_LEDGER_PATH, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS)
+    if TRANSCRIPTION_MODE == 'distributed' else None
+)
+
+
+# =============================================================================
+# Metrics and Profiling
+# =============================================================================
+
+metrics = Registry()
+
+request_duration = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route',
+    ('route', 'method', 'status')
+)
+whisper_duration = metrics.histogram(
+    'whisper_transcribe_seconds', 'Whisper processing time per call', ('model',)
+)
+whisper_real_time_factor = metrics.histogram(
+    'whisper_real_time_factor', 'Whisper processing time divided by audio duration', ('model',),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+)
+whisper_audio_seconds = metrics.counter(
+    'whisper_audio_seconds', 'Seconds of audio sent to Whisper', ('model',)
+)
+audio_decode_duration = metrics.histogram(
+    'audio_decode_seconds', 'Audio decode and resample time', ('operation',)
+)
+azure_request_duration = metrics.histogram(
+    'azure_request_seconds', 'Latency of outbound Azure calls by calling route',
+    ('service', 'endpoint', 'status')
+)
+llm_tokens = metrics.counter(
+    'llm_tokens', 'Azure OpenAI tokens used by calling route', ('endpoint', 'kind')
+)
+lane_active = metrics.gauge('scheduler_lane_active', 'Work items running in a lane', ('lane',))
+lane_waiting = metrics.gauge('scheduler_lane_waiting', 'Work items queued for a lane', ('lane',))
+lane_rejected = metrics.counter('scheduler_lane_rejected', 'Work items rejected by a lane', ('lane',))
+refinements_running = metrics.gauge('transcription_refinements_running', 'Background refinement passes in progress')
+transcription_jobs = metrics.gauge('transcription_jobs', 'Ledger jobs by status', ('status',))
+
+profiler = SamplingProfiler(interval=PROFILER_INTERVAL, window=PROFILER_WINDOW, output_dir=PROFILE_FOLDER)
+if PROFILER_ENABLED:
+    profiler.start()
+
+
+def collect_queue_metrics():
+    """Refresh queue-depth gauges from the scheduler and the job ledger."""
+    for name, stats in scheduler.stats().items():
+        lane_active.set(stats['active'], lane=name)
+        lane_waiting.set(stats['waiting'], lane=name)
+        lane_rejected.set(stats['rejected'], lane=name)
+
+    refinements_running.set(storage.transcript_counts().get('refining', 0))
+
+    if job_ledger is not None:
+        counts = job_ledger.counts()
+        for status in ('pending', 'running', 'done', 'failed'):
+            transcription_jobs.set(counts.get(status, 0), status=status)
+
+
+metrics.add_collector(collect_queue_metrics)
+
 
 # =============================================================================
 # Utility Functions
@@ -74,10 +240,53 @@ def validate_azure_openai_config():
 
 def validate_speech_config():
     """Validate Azure Speech Service configuration."""
-    return bool(SPEECH_KEY and SPEECH_REGION)
+    return bool(SPEECH_KEY and (SPEECH_REGION or SPEECH_ENDPOINT))
+
+
+async def post_to_azure(service, url, **kwargs):
+    """
+    POST to an Azure service with the shared client, recording latency and token use.
+
+    Args:
+        service (str): "openai" or "speech", used as a metric label
+        url (str): Request URL
+        **kwargs: Extra arguments for ``httpx.AsyncClient.post``
+
+    Returns:
+        httpx.Response: The service response
+    """
+    endpoint = request.endpoint or 'unknown'
+    started = time.monotonic()
+    status = 'error'
+    try:
+        response = await http_client.post(url, **kwargs)
+        status = response.status_code
+        if service == 'openai' and status == 200:
+            usage = response.json().get('usage', {})
+            llm_tokens.inc(usage.get('prompt_tokens', 0), endpoint=endpoint, kind='prompt')
+            llm_tokens.inc(usage.get('completion_tokens', 0), endpoint=endpoint, kind='completion')
+        return response
+    except asyncio.CancelledError:
+        status = 'cancelled'
+        raise
+    finally:
+        azure_request_duration.observe(
+            time.monotonic() - started, service=service, endpoint=endpoint, status=status
+        )
+
+
+def azure_openai_url():
+    """Return the chat completions URL of the configured Azure OpenAI deployment."""
+    return f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/{AZURE_OPENAI_DEPLOYMENT}/chat/completions?api-version={AZURE_OPENAI_API_VERSION}"
 
 
-def call_azure_openai(system_prompt, user_prompt, max_tokens=800, temperature=0.7):
+def azure_speech_url():
+    """Return the short-audio speech recognition URL for the configured region or endpoint."""
+    base_url = SPEECH_ENDPOINT or f"https://{SPEECH_REGION}.stt.speech.microsoft.com"
+    return f"{base_url.rstrip('/')}/speech/recognition/conversation/cognitiveservices/v1"
+
+
+async def call_azure_openai(system_prompt, user_prompt, max_tokens=800, temperature=0.7):
     """
     Make a call to Azure OpenAI API.
 
@@ -108,21 +317,21 @@ def call_azure_openai(system_prompt, user_prompt, max_tokens=800, temperature=0.
             "temperature": temperature
         }
 
-        response = requests.post(
-            f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/{AZURE_OPENAI_DEPLOYMENT}/chat/completions?api-version={AZURE_OPENAI_API_VERSION}",
+        response = await post_to_azure(
+            'openai',
+            azure_openai_url(),
             headers=headers,
-            json=payload,
-            timeout=30
+            json=payload
         )
 
         if response.status_code == 200:
             return response.json()
         else:
-            print(f"Azure OpenAI API error: {response.status_code} - {response.text}")
+            logger.error("Azure OpenAI API error: %s - %s", response.status_code, response.text)
             return None
 
     except Exception as e:
-        print(f"Error calling Azure OpenAI: {str(e)}")
+        logger.error("Error calling Azure OpenAI: %s", e)
         return None
 
 
@@ -134,11 +343,13 @@ def convert_audio_to_wav(input_path, output_path):
         input_path (str): Path to input audio file
         output_path (str): Path for output WAV file
     """
+    started = time.monotonic()
     audio = AudioSegment.from_file(input_path)
     audio = audio.set_frame_rate(16000)
     audio = audio.set_channels(1)
     audio = audio.set_sample_width(2)
     audio.export(output_path, format="wav")
+    audio_decode_duration.observe(time.monotonic() - started, operation='convert_to_wav')
 
 
 def cleanup_temp_files(*file_paths):
@@ -199,6 +410,17 @@ def fallback_command_interpretation(command):
         'execution_mode': 'sequential'
     }
 
+async def get_json_body():
+    """
+    Return the request's JSON object.
+
+    Missing, malformed or non-object bodies give an empty dict, so the
+    routes' required-field checks answer 400 instead of failing with a 500.
+    """
+    data = await request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+
 def parse_json_from_text(text):
     """
     Extract JSON from text that might contain markdown formatting.
@@ -225,20 +447,392 @@ def parse_json_from_text(text):
     return None
 
 
+# =============================================================================
+# Transcription Helpers
+# =============================================================================
+
+def record_whisper_call(model_size, elapsed, audio_seconds):
+    """Record the duration and real-time factor of a Whisper call."""
+    whisper_duration.observe(elapsed, model=model_size)
+    if audio_seconds:
+        whisper_audio_seconds.inc(audio_seconds, model=model_size)
+        whisper_real_time_factor.observe(elapsed / audio_seconds, model=model_size)
+
+
+def record_audio_decode(elapsed):
+    """Record the time taken to decode an upload to PCM."""
+    audio_decode_duration.observe(elapsed, operation='load_pcm')
+
+
+def save_transcription(transcription_id, segments, status='final', filename=None):
+    """
+    Write transcription segments and their status atomically.
+
+    The file is replaced in one step so polling readers never see a partial
+    write. The status travels with the segments, so a draft left behind by a
+    restart is never mistaken for a final transcript.
+
+    Args:
+        transcription_id (str): Transcription identifier
+        segments (list): Transcription segments
+        status (str): "refining" for a progressive draft, "failed" if its
+            refinement failed, otherwise "final"
+        filename (str): Original upload name, needed to resume a refinement
+    """
+    document = {'status': status, 'filename': filename, 'segments': segments}
+    storage.write_transcript(
+        transcription_id, json.dumps(document, ensure_ascii=False, indent=2), status=status
+    )
+
+
+def load_transcription_document(transcription_id):
+    """
+    Load a stored transcription (decompressing cold ones).
+
+    Returns:
+        dict: status, filename and segments, or None if missing. Transcripts
+        stored as a bare segment list are final.
+    """
+    text = storage.read_transcript(transcription_id)
+    if text is None:
+        return None
+    document = json.loads(text)
+    if isinstance(document, list):
+        return {'status': 'final', 'filename': None, 'segments': document}
+    return document
+
+
+def load_transcription(transcription_id):
+    """Load stored transcription segments (decompressing cold ones), or None if missing."""
+    document = load_transcription_document(transcription_id)
+    return document['segments'] if document is not None else None
+
+
+# Whisper pipeline shared with the workers; segments of recurring audio are
+# reused from stored transcripts
+transcriber = Transcriber(
+    fingerprint_index=fingerprint_index,
+    load_segments=load_transcription,
+    on_whisper=record_whisper_call,
+    on_decode=record_audio_decode
+)
+transcriber.add_model(WHISPER_MODEL_SIZE, model)
+
+
+def refine_segments(transcription_id, file_path):
+    """Re-transcribe with the main model and swap refined text into the stored draft."""
+    refined_segments = transcriber.transcribe_file(WHISPER_MODEL_SIZE, transcription_id, file_path)
+    draft = load_transcription_document(transcription_id) or {'segments': [], 'filename': None}
+    save_transcription(
+        transcription_id,
+        merge_refined_segments(draft['segments'], refined_segments),
+        filename=draft['filename']
+    )
+
+
+def mark_refinement_failed(transcription_id):
+    """Keep a draft whose refinement failed, but stop reporting it as refining."""
+    draft = load_transcription_document(transcription_id)
+    if draft is not None and draft.get('status') == 'refining':
+        save_transcription(transcription_id, draft['segments'], status='failed', filename=draft['filename'])
+
+
+def refine_transcription(transcription_id, file_path):
+    """
+    Refine a progressive draft in the background.
+
+    Runs in its own thread after the draft has been served, in the bulk lane
+    but without admission control since the job was already accepted.
+    """
+    try:
+        with scheduler.lane('bulk').slot(admit=False):
+            refine_segments(transcription_id, file_path)
+    except Exception as e:
+        logger.error("Transcription refinement error for %s: %s", transcription_id, e)
+        mark_refinement_failed(transcription_id)
+
+
+def resume_refinements():
+    """
+    Restart refinements a previous run of this server left unfinished.
+
+    Drafts whose audio is gone are marked failed. In distributed mode the
+    ledger re-queues interrupted jobs instead; only drafts of jobs that ran
+    out of attempts while their worker was down are marked failed here.
+    """
+    if job_ledger is not None:
+        for transcription_id in storage.transcripts_with_status('refining'):
+            job = job_ledger.get(transcription_id)
+            if job is not None and job['status'] == 'failed':
+                mark_refinement_failed(transcription_id)
+        return
+
+    for transcription_id in storage.transcripts_with_status('refining'):
+        draft = load_transcription_document(transcription_id)
+        file_path = None
+        if draft is not None and draft.get('filename'):
+            file_path = storage.find_upload(transcription_id, draft['filename'])
+
+        if file_path is None:
+            logger.warning("Cannot resume refinement of %s: audio not found", transcription_id)
+            mark_refinement_failed(transcription_id)
+            continue
+
+        logger.info("Resuming refinement of %s", transcription_id)
+        threading.Thread(
+            target=refine_transcription,
+            args=(transcription_id, file_path),
+            daemon=True
+        ).start()
+
+
+def get_transcription_status(transcription_id, document=None):
+    """
+    Return the status of a transcription.
+
+    A ledger job that is not done yet decides the status; otherwise the
+    status stored with the transcript does.
+
+    Args:
+        transcription_id (str): Transcription identifier
+        document (dict): Already loaded transcription, to skip a lookup
+
+    Returns:
+        str: "queued", "transcribing", "refining", "final" or "failed", or
+        None if the transcription is unknown
+    """
+    job = job_ledger.get(transcription_id) if job_ledger else None
+    if job is not None and job['status'] != 'done':
+        if job['status'] == 'running':
+            return job['stage'] or 'transcribing'
+        return 'queued' if job['status'] == 'pending' else 'failed'
+
+    if document is not None:
+        return document.get('status', 'final')
+    return storage.transcript_status(transcription_id)
+
+
+# =============================================================================
+# Distributed Transcription Workers
+# =============================================================================
+
+def process_transcription_job(job, worker_id):
+    """
+    Transcribe a job claimed from the ledger and store the result.
+
+    Progressive jobs save the draft first and mark the job "refining", so
+    clients polling any node can show it before the final pass completes.
+    Called with a bulk slot held.
+    """
+    transcription_id = job['job_id']
+    file_path = storage.find_upload(transcription_id, job['filename'])
+    if file_path is None:
+        raise FileNotFoundError(f"Upload not found: {transcription_id}_{job['filename']}")
+
+    if job['options'].get('progressive'):
+        draft_segments = transcriber.transcribe_file(DRAFT_MODEL_SIZE, transcription_id, file_path, final=False)
+        save_transcription(transcription_id, draft_segments, status='refining', filename=job['filename'])
+        job_ledger.set_stage(transcription_id, worker_id, 'refining')
+        refine_segments(transcription_id, file_path)
+    else:
+        segments = transcriber.transcribe_file(WHISPER_MODEL_SIZE, transcription_id, file_path)
+        save_transcription(transcription_id, segments, filename=job['filename'])
+
+
+def keep_job_lease(job_id, worker_id, stop_event):
+    """Renew a job lease until stopped or until the lease is lost."""
+    while not stop_event.wait(JOB_HEARTBEAT_INTERVAL):
+        try:
+            if not job_ledger.heartbeat(job_id, worker_id):
+                logger.warning("Lost lease on transcription job %s", job_id)
+                return
+        except Exception as e:
+            logger.error("Heartbeat error for transcription job %s: %s", job_id, e)
+
+
+def run_worker(worker_id):
+    """
+    Claim and process transcription jobs from the shared ledger, forever.
+
+    A bulk slot is taken before claiming, so a node never holds leases on
+    jobs it has no slot to run while idle nodes could take them.
+
+    Args:
+        worker_id (str): Unique identifier of this worker
+    """
+    logger.info("Transcription worker %s started", worker_id)
+    lane = scheduler.lane('bulk')
+
+    while True:
+        lane.acquire(admit=False)
+        try:
+            job = job_ledger.claim(worker_id)
+        except Exception as e:
+            logger.error("Error claiming transcription job: %s", e)
+            job = None
+
+        if job is None:
+            lane.release()
+            time.sleep(WORKER_POLL_INTERVAL)
+            continue
+
+        started = time.monotonic()
+        stop_heartbeat = threading.Event()
+        threading.Thread(
+            target=keep_job_lease,
+            args=(job['job_id'], worker_id, stop_heartbeat),
+            daemon=True
+        ).start()
+
+        try:
+            process_transcription_job(job, worker_id)
+            job_ledger.complete(job['job_id'], worker_id)
+        except Exception as e:
+            logger.error("Transcription job %s failed: %s", job['job_id'], e)
+            try:
+                if job_ledger.fail(job['job_id'], worker_id, str(e)) \
+                        and job_ledger.get(job['job_id'])['status'] == 'failed':
+                    mark_refinement_failed(job['job_id'])
+            except Exception as e:
+                logger.error("Error failing transcription job %s: %s", job['job_id'], e)
+        finally:
+            stop_heartbeat.set()
+            lane.release(started)
+
+
+def start_embedded_workers(count):
+    """Start worker threads inside this process."""
+    for index in range(count):
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+        threading.Thread(target=run_worker, args=(worker_id,), daemon=True).start()
+
+
 # =============================================================================
 # Main Routes
 # =============================================================================
 
+@app.before_serving
+async def open_http_client():
+    """Create the shared async HTTP client for outbound Azure calls."""
+    global http_client
+    http_client = httpx.AsyncClient(
+        timeout=AZURE_HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=AZURE_MAX_CONNECTIONS,
+            max_keepalive_connections=AZURE_MAX_CONNECTIONS // 4
+        )
+    )
+
+
+@app.before_serving
+async def resume_interrupted_refinements():
+    """Pick up progressive refinements interrupted by a restart."""
+    await asyncio.to_thread(resume_refinements)
+
+
+@app.after_serving
+async def close_http_client():
+    """Close the shared async HTTP client."""
+    await http_client.aclose()
+
+
+@app.before_request
+async def start_request_timer():
+    """Remember when the request started, for latency metrics and profiling."""
+    g.request_started = time.monotonic()
+
+
+@app.after_request
+async def record_request_metrics(response):
+    """Record route latency and dump profiler samples of slow requests."""
+    started = g.get('request_started')
+    if started is None:
+        return response
+
+    finished = time.monotonic()
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    request_duration.observe(finished - started, route=route, method=request.method, status=response.status_code)
+
+    if profiler.enabled and finished - started >= SLOW_REQUEST_SECONDS:
+        profile_path = await asyncio.to_thread(profiler.dump, f"{request.method}_{route}", started, finished)
+        if profile_path:
+            logger.warning("Slow request %s %s took %.2fs, profile written to %s",
+                           request.method, route, finished - started, profile_path)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+async def prometheus_metrics():
+    """Expose metrics in the Prometheus text format."""
+    body = await asyncio.to_thread(metrics.render)
+    return body, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+@app.route('/profiler', methods=['GET', 'POST'])
+async def profiler_toggle():
+    """
+    Report or switch the sampling profiler.
+
+    POST ``{"enabled": true}`` to start sampling, ``false`` to stop.
+
+    Returns:
+        JSON response with profiler state
+    """
+    if request.method == 'POST':
+        data = await get_json_body()
+        if 'enabled' not in data:
+            return jsonify({'error': 'Missing enabled flag'}), 400
+
+        if data['enabled']:
+            profiler.start()
+        else:
+            await asyncio.to_thread(profiler.stop)
+
+    return jsonify({
+        'enabled': profiler.enabled,
+        'slow_request_seconds': SLOW_REQUEST_SECONDS,
+        'output_folder': PROFILE_FOLDER
+    })
+
+
 @app.route('/')
-def index():
+async def index():
     """Serve the main application page."""
-    return render_template('index.html')
+    return await render_template('index.html')
 
 
 @app.route('/uploads/<filename>')
-def uploaded_file(filename):
+async def uploaded_file(filename):
     """Serve uploaded files."""
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    file_id, _, original_name = filename.partition('_')
+    file_path = await asyncio.to_thread(storage.find_upload, file_id, original_name)
+    if file_path is None:
+        return jsonify({'error': 'File not found'}), 404
+
+    await asyncio.to_thread(storage.record, file_path, 'audio', file_id)
+    return await send_from_directory(os.path.dirname(file_path), os.path.basename(file_path))
+
+
+@app.route('/queue_status', methods=['GET'])
+async def queue_status():
+    """Report active, waiting and rejected work per scheduler lane and ledger job counts."""
+    jobs = await asyncio.to_thread(job_ledger.counts) if job_ledger else {}
+    return jsonify({
+        'lanes': scheduler.stats(),
+        'jobs': jobs
+    })
+
+
+@app.errorhandler(LaneSaturated)
+def handle_lane_saturated(error):
+    """Reject work for a saturated lane with 429 and a Retry-After hint."""
+    response = jsonify({
+        'error': 'Server busy, please retry shortly',
+        'lane': error.lane,
+        'retry_after': error.retry_after
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
 
 
 # =============================================================================
@@ -246,24 +840,29 @@ def uploaded_file(filename):
 # =============================================================================
 
 @app.route('/upload', methods=['POST'])
-def upload_file():
+async def upload_file():
     """
     Handle file upload and return a unique file ID.
 
     Returns:
         JSON response with file_id and filename or error message
     """
-    if 'file' not in request.files:
+    files = await request.files
+    if 'file' not in files:
         return jsonify({'error': 'No file part'}), 400
 
-    file = request.files['file']
+    file = files['file']
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
 
     # Generate unique ID and save file
     file_id = str(uuid.uuid4())
-    file_path = os.path.join(UPLOAD_FOLDER, f"{file_id}_{file.filename}")
-    file.save(file_path)
+    file_path = await asyncio.to_thread(storage.upload_path, file_id, file.filename)
+    await file.save(file_path)
+
+    # Track the upload and evict old audio if the quota is exceeded
+    await asyncio.to_thread(storage.record, file_path, 'audio', file_id, True)
+    await asyncio.to_thread(storage.enforce_quota)
 
     return jsonify({
         'message': 'File uploaded successfully',
@@ -272,57 +871,126 @@ def upload_file():
     })
 
 
+async def run_in_bulk_lane(func, *args):
+    """
+    Wait for a bulk slot in the event loop, then run ``func`` on the Whisper executor.
+
+    The slot is released by the executor thread when ``func`` finishes, so a
+    client disconnecting mid-transcription cannot free it while Whisper is
+    still running.
+
+    Raises:
+        LaneSaturated: If the bulk queue is full
+    """
+    lane = scheduler.lane('bulk')
+    await lane.acquire_async()
+    started = time.monotonic()
+
+    def run():
+        try:
+            return func(*args)
+        finally:
+            lane.release(started)
+
+    try:
+        future = whisper_executor.submit(run)
+    except BaseException:
+        lane.release(started)
+        raise
+    return await asyncio.shield(asyncio.wrap_future(future))
+
+
+def transcribe_locally(file_id, filename, file_path, progressive):
+    """
+    Transcribe in this process. Called on the Whisper executor with a bulk slot held.
+
+    Returns:
+        list: Transcription segments (a draft in progressive mode)
+    """
+    # Transcribe with Whisper, using the draft model first in progressive mode
+    model_size = DRAFT_MODEL_SIZE if progressive else WHISPER_MODEL_SIZE
+    segments = transcriber.transcribe_file(model_size, file_id, file_path, final=not progressive)
+
+    # Save transcription
+    save_transcription(file_id, segments, status='refining' if progressive else 'final', filename=filename)
+
+    if progressive:
+        threading.Thread(
+            target=refine_transcription,
+            args=(file_id, file_path),
+            daemon=True
+        ).start()
+
+    return segments
+
+
+def read_transcription(transcription_id):
+    """Return stored segments (or None) and the status of a transcription."""
+    document = load_transcription_document(transcription_id)
+    segments = document['segments'] if document is not None else None
+    return segments, get_transcription_status(transcription_id, document)
+
+
 @app.route('/transcribe', methods=['POST'])
-def transcribe_audio():
+async def transcribe_audio():
     """
     Transcribe uploaded audio file using Whisper.
 
+    With ``progressive`` set, a draft from the tiny model is returned right away
+    and the main model refines it in the background; refined segments carry a
+    higher ``version`` and are served by ``/get_transcription``.
+
+    In distributed mode the job is only queued (202) and segments are fetched
+    from ``/get_transcription`` once a worker has produced them.
+
     Returns:
         JSON response with transcription segments or error message
     """
-    data = request.json
+    data = await get_json_body()
     file_id = data.get('file_id')
     filename = data.get('filename')
+    progressive = bool(data.get('progressive', False))
 
     if not file_id or not filename:
         return jsonify({'error': 'Missing file ID or filename'}), 400
 
-    file_path = os.path.join(UPLOAD_FOLDER, f"{file_id}_{filename}")
+    file_path = await asyncio.to_thread(storage.find_upload, file_id, filename)
 
-    if not os.path.exists(file_path):
+    if file_path is None:
         return jsonify({'error': 'File not found'}), 404
 
-    try:
-        # Transcribe with Whisper
-        result = model.transcribe(file_path, word_timestamps=True)
-
-        # Process segments with word-level timestamps
-        segments = []
-        for segment in result["segments"]:
-            segments.append({
-                "start": segment["start"],
-                "end": segment["end"],
-                "text": segment["text"].strip(),
-                "words": segment.get("words", [])
-            })
+    await asyncio.to_thread(storage.record, file_path, 'audio', file_id, True)
 
-        # Save transcription
-        transcription_path = os.path.join(TRANSCRIPTION_FOLDER, f"{file_id}_transcription.json")
-        with open(transcription_path, 'w', encoding='utf-8') as f:
-            json.dump(segments, f, ensure_ascii=False, indent=2)
+    if job_ledger is not None:
+        try:
+            await asyncio.to_thread(job_ledger.enqueue, file_id, filename, {'progressive': progressive})
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
 
         return jsonify({
-            'message': 'Transcription completed',
+            'message': 'Transcription queued',
             'transcription_id': file_id,
-            'segments': segments
-        })
+            'segments': [],
+            'status': 'queued'
+        }), 202
 
+    try:
+        segments = await run_in_bulk_lane(transcribe_locally, file_id, filename, file_path, progressive)
+    except LaneSaturated:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+    return jsonify({
+        'message': 'Draft transcription completed' if progressive else 'Transcription completed',
+        'transcription_id': file_id,
+        'segments': segments,
+        'status': 'refining' if progressive else 'final'
+    })
+
 
 @app.route('/get_transcription/<transcription_id>', methods=['GET'])
-def get_transcription(transcription_id):
+async def get_transcription(transcription_id):
     """
     Retrieve saved transcription by ID.
 
@@ -330,18 +998,21 @@ def get_transcription(transcription_id):
         transcription_id (str): Unique transcription identifier
 
     Returns:
-        JSON response with transcription segments or error message
+        JSON response with transcription segments and status ("queued",
+        "transcribing", "refining", "final" or "failed") or error message
     """
-    transcription_path = os.path.join(TRANSCRIPTION_FOLDER, f"{transcription_id}_transcription.json")
-
-    if not os.path.exists(transcription_path):
-        return jsonify({'error': 'Transcription not found'}), 404
-
     try:
-        with open(transcription_path, 'r', encoding='utf-8') as f:
-            segments = json.load(f)
+        segments, status = await asyncio.to_thread(read_transcription, transcription_id)
+
+        if segments is None:
+            if status in ('queued', 'transcribing', 'failed') and job_ledger is not None:
+                return jsonify({'segments': [], 'status': status})
+            return jsonify({'error': 'Transcription not found'}), 404
 
-        return jsonify({'segments': segments})
+        return jsonify({
+            'segments': segments,
+            'status': status
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -351,18 +1022,22 @@ def get_transcription(transcription_id):
 # =============================================================================
 
 @app.route('/recognize_speech', methods=['POST'])
-def recognize_speech():
+@scheduler.limit('interactive')
+async def recognize_speech():
     """
     Perform real-time speech recognition using Azure Speech Service REST API.
 
     Returns:
         JSON response with recognized transcript or error message
     """
-    if 'audio' not in request.files:
+    files = await request.files
+    form = await request.form
+
+    if 'audio' not in files:
         return jsonify({'error': 'No audio file part in the request'}), 400
 
-    audio_file = request.files['audio']
-    language = request.form.get('language', 'en-US')
+    audio_file = files['audio']
+    language = form.get('language', 'en-US')
 
     if not audio_file:
         return jsonify({'error': 'No audio file provided'}), 400
@@ -378,16 +1053,14 @@ def recognize_speech():
 
     try:
         # Save and convert audio
-        audio_file.save(temp_input_path)
-        convert_audio_to_wav(temp_input_path, temp_output_path)
+        await audio_file.save(temp_input_path)
+        await asyncio.to_thread(convert_audio_to_wav, temp_input_path, temp_output_path)
 
         # Read converted audio
         with open(temp_output_path, 'rb') as wav_file:
             audio_data = wav_file.read()
 
         # Azure Speech Service API call
-        endpoint = f"https://{SPEECH_REGION}.stt.speech.microsoft.com/speech/recognition/conversation/cognitiveservices/v1"
-
         headers = {
             'Ocp-Apim-Subscription-Key': SPEECH_KEY,
             'Content-Type': 'audio/wav; codecs=audio/pcm; samplerate=16000',
@@ -399,12 +1072,12 @@ def recognize_speech():
             'format': 'detailed'
         }
 
-        response = requests.post(
-            endpoint,
+        response = await post_to_azure(
+            'speech',
+            azure_speech_url(),
             headers=headers,
             params=params,
-            data=audio_data,
-            timeout=30
+            content=audio_data
         )
 
         if response.status_code == 200:
@@ -427,7 +1100,7 @@ def recognize_speech():
             return jsonify({'error': error_message}), 500
 
     except Exception as e:
-        print(f"Azure Speech Recognition Error: {e}")
+        logger.error("Azure Speech Recognition Error: %s", e)
         return jsonify({'error': str(e)}), 500
 
     finally:
@@ -439,14 +1112,15 @@ def recognize_speech():
 # =============================================================================
 
 @app.route('/generate_summary', methods=['POST'])
-def generate_summary():
+@scheduler.limit('interactive')
+async def generate_summary():
     """
     Generate a summary of the transcript using Azure OpenAI.
 
     Returns:
         JSON response with summary or error message
     """
-    data = request.json
+    data = await get_json_body()
     transcript_text = data.get('transcript_text')
 
     if not transcript_text:
@@ -465,10 +1139,9 @@ def generate_summary():
         Summary:
         """
 
-        result = call_azure_openai(system_prompt, user_prompt, max_tokens=500)
+        result = await call_azure_openai(system_prompt, user_prompt, max_tokens=500)
 
         if result and 'choices' in result:
-            print(result)
             markdown_summary = result["choices"][0]["message"]["content"].strip()
 
             # Convert Markdown to HTML
@@ -485,8 +1158,9 @@ def generate_summary():
 
 
 @app.route('/generate_bookmark_comment', methods=['POST'])
-def generate_bookmark_comment():
-    data = request.json
+@scheduler.limit('interactive')
+async def generate_bookmark_comment():
+    data = await get_json_body()
     transcript_text = data.get('transcript_text')
     existing_comment = data.get('existing_comment', '')  # Get existing comment
 
@@ -506,7 +1180,7 @@ def generate_bookmark_comment():
 
         Comment:"""
 
-        result = call_azure_openai(system_prompt, user_prompt, max_tokens=150)
+        result = await call_azure_openai(system_prompt, user_prompt, max_tokens=150)
 
         if result and 'choices' in result:
             new_comment = result["choices"][0]["message"]["content"].strip()
@@ -526,14 +1200,15 @@ def generate_bookmark_comment():
 
 
 @app.route('/chat', methods=['POST'])
-def chat():
+@scheduler.limit('interactive')
+async def chat():
     """
     Handle chat queries with transcript context using Azure OpenAI.
 
     Returns:
         JSON response with AI response or error message
     """
-    data = request.json
+    data = await get_json_body()
     query = data.get('query')
     transcript_context = data.get('transcript_context', '')
     chat_history = data.get('chat_history', [])
@@ -573,8 +1248,9 @@ def chat():
             "max_tokens": 800
         }
 
-        response = requests.post(
-            f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/{AZURE_OPENAI_DEPLOYMENT}/chat/completions?api-version={AZURE_OPENAI_API_VERSION}",
+        response = await post_to_azure(
+            'openai',
+            azure_openai_url(),
             headers=headers,
             json=payload
         )
@@ -595,7 +1271,8 @@ def chat():
 # =============================================================================
 
 @app.route('/interpret_command', methods=['POST'])
-def interpret_command():
+@scheduler.limit('interactive')
+async def interpret_command():
     """
     Interpret natural language commands for audio player control.
 
@@ -603,9 +1280,9 @@ def interpret_command():
         JSON response with structured command or error message
     """
     try:
-        data = request.json
+        data = await get_json_body()
 
-        if not data or 'command' not in data:
+        if 'command' not in data:
             return jsonify({'error': 'No command provided'}), 400
 
         command = data['command']
@@ -614,7 +1291,7 @@ def interpret_command():
 
         # Try AI-powered interpretation first
         if validate_azure_openai_config():
-            ai_response = interpret_command_with_ai(command, app_state, command_history)
+            ai_response = await interpret_command_with_ai(command, app_state, command_history)
             if ai_response:
                 ai_response['execute'] = True
                 ai_response['message'] = f"Executing plan: {ai_response.get('intent', 'Unknown command')}"
@@ -635,11 +1312,11 @@ def interpret_command():
         return jsonify(fallback_response), 200
 
     except Exception as e:
-        print(f"Error in command interpretation: {str(e)}")
+        logger.error("Error in command interpretation: %s", e)
         return jsonify({'error': 'Error processing command', 'actions': [{'action': 'unknown', 'parameters': {}}]}), 200
 
 
-def interpret_command_with_ai(command, app_state, command_history):
+async def interpret_command_with_ai(command, app_state, command_history):
     """
     Use Azure OpenAI to interpret natural language commands.
 
@@ -728,11 +1405,11 @@ def interpret_command_with_ai(command, app_state, command_history):
     - Break complex commands into logical steps
     """
 
-    result = call_azure_openai(system_prompt, user_prompt, max_tokens=800, temperature=0.3)
+    result = await call_azure_openai(system_prompt, user_prompt, max_tokens=800, temperature=0.3)
 
     if result and 'choices' in result:
         content = result['choices'][0]['message']['content']
-        print(f'DEBUG: content')
+        logger.debug("Command interpretation response: %s", content)
         return parse_json_from_text(content)
 
     return None
@@ -759,12 +1436,26 @@ def validate_plan(plan_response, app_state):
 # =============================================================================
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Audio Transcription Server')
+    parser.add_argument('--worker', action='store_true',
+                        help='Run as a transcription worker for the shared job ledger instead of the web server')
+    args = parser.parse_args()
+
+    if args.worker:
+        if job_ledger is None:
+            parser.error('Worker mode requires TRANSCRIPTION_MODE=distributed')
+        run_worker(f"{socket.gethostname()}-{os.getpid()}")
+
     print("Starting Audio Transcription Server")
     print("=" * 50)
     print(f"Server URL: http://localhost:5000")
     print(f"Whisper Model: {WHISPER_MODEL_SIZE}")
+    print(f"Transcription Mode: {TRANSCRIPTION_MODE}")
     print(f"Azure OpenAI: {'✓' if validate_azure_openai_config() else '✗'}")
     print(f"Azure Speech: {'✓' if validate_speech_config() else '✗'}")
     print("=" * 50)
 
+    if job_ledger is not None and EMBEDDED_WORKERS > 0:
+        start_embedded_workers(EMBEDDED_WORKERS)
+
     app.run(debug=True, port=5000)
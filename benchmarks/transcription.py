@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Transcription benchmark: real-time factor, memory and latency per model size
+
+Transcribes through ``utils.transcription.Transcriber``, the pipeline behind
+``/transcribe`` and the workers (fingerprint lookup included, against an empty
+index unless ``--no-fingerprint``), over 1, 10 and 60 minute inputs in three
+modes:
+
+- ``plain``: without word timestamps
+- ``words``: with word timestamps, as the app transcribes
+- ``progressive``: a draft with the draft model, then the refinement pass and
+  the merge of refined words into the draft
+
+and records:
+
+- Real-time factor (total processing time / audio duration)
+- Peak resident memory of the process, model included
+- Time until segments can be served (the draft in progressive mode)
+- Time to the first decoded 30-second window
+- Word-timestamp overhead (relative slowdown of the word-timestamp run)
+
+Every case runs in a fresh subprocess so memory peaks and warm caches do not
+leak between cases. Input audio is prepared once by the parent and handed to
+each case as a ``.npy`` file, so synthesis does not count towards the peak
+memory of a case. It is either a fixture file (tiled or trimmed to each
+duration) or deterministic synthetic speech-like audio, so the suite runs
+offline once the Whisper models are cached.
+
+    python -m benchmarks.transcription --models tiny base --output results.json
+    python -m benchmarks.transcription --baseline baseline.json
+
+With ``--baseline``, the run is compared against stored results and the exit
+status is 1 if any metric regressed by more than ``--threshold``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+SAMPLE_RATE = 16000  # Whisper decodes audio to 16kHz mono
+DEFAULT_MODELS = ['tiny', 'base']  # The app's draft and main model sizes
+DEFAULT_DURATIONS = [1, 10, 60]  # Minutes
+MODES = ['plain', 'words', 'progressive']
+DEFAULT_DRAFT_MODEL = 'tiny'
+WARMUP_SECONDS = 5
+NOISE_CHUNK_SECONDS = 60  # Background noise is generated a minute at a time
+CASE_TRANSCRIPTION_ID = 'benchmark'
+REGRESSION_METRICS = ('rtf', 'first_segment_seconds', 'peak_rss_mb')
+
+# Rough first and second formants (Hz) of common vowels, for synthetic speech
+VOWEL_FORMANTS = [(730, 1090), (270, 2290), (530, 1840), (570, 840), (300, 870), (660, 1720), (440, 1020)]
+
+
+# =============================================================================
+# Benchmark Audio
+# =============================================================================
+
+def synthesize_speech(seconds, seed=0):
+    """
+    Generate deterministic speech-like audio: voiced syllables grouped into words.
+
+    Each syllable is a harmonic series on a gliding pitch, shaped by vowel
+    formants and a smooth envelope, followed by pauses of varying length. It
+    is not intelligible, but exercises the decoder on every window instead of
+    letting voice activity in silence short-circuit it.
+
+    Args:
+        seconds (float): Audio duration
+        seed (int): Random seed
+
+    Returns:
+        numpy.ndarray: 16kHz mono float32 samples
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    harmonics = np.arange(1, 41)
+    position = 0
+
+    while position < total:
+        for _ in range(rng.integers(1, 5)):
+            length = int(rng.uniform(0.12, 0.3) * SAMPLE_RATE)
+            if position + length > total:
+                break
+
+            pitch = rng.uniform(100, 220)
+            first, second = VOWEL_FORMANTS[rng.integers(len(VOWEL_FORMANTS))]
+            freqs = harmonics * pitch
+            freqs = freqs[freqs < SAMPLE_RATE / 2 - 1000]
+            amplitudes = (np.exp(-((freqs - first) / 150) ** 2)
+                          + 0.5 * np.exp(-((freqs - second) / 250) ** 2) + 0.02)
+
+            glide = 1 + rng.uniform(-0.15, 0.15) * np.linspace(0, 1, length)
+            phase = 2 * np.pi * np.cumsum(glide) / SAMPLE_RATE
+            syllable = np.sin(np.outer(phase, freqs)) @ amplitudes
+            audio[position:position + length] = syllable * np.hanning(length)
+            position += length
+
+        position += int(rng.uniform(0.05, 0.6) * SAMPLE_RATE)
+
+    audio /= max(np.abs(audio).max(), 1e-6) / 0.5
+    chunk = NOISE_CHUNK_SECONDS * SAMPLE_RATE
+    for start in range(0, total, chunk):
+        end = min(start + chunk, total)
+        audio[start:end] += rng.normal(0, 0.003, end - start).astype(np.float32)
+    return audio
+
+
+def load_fixture(path, seconds):
+    """Decode a fixture file and tile or trim it to the requested duration."""
+    import whisper
+
+    samples = whisper.load_audio(path)
+    if len(samples) == 0:
+        raise ValueError(f"Fixture {path} contains no audio")
+    return np.resize(samples, int(seconds * SAMPLE_RATE))
+
+
+def prepare_audio(minutes, directory, fixture=None, seed=0):
+    """
+    Write the input of a duration to ``<directory>/<minutes>min.npy``.
+
+    Returns:
+        str: Path of the written file
+    """
+    seconds = minutes * 60
+    audio = load_fixture(fixture, seconds) if fixture else synthesize_speech(seconds, seed=seed)
+    path = os.path.join(directory, f"{minutes:g}min.npy")
+    np.save(path, audio.astype(np.float32, copy=False))
+    return path
+
+
+# =============================================================================
+# Single Case (runs in a subprocess)
+# =============================================================================
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(case):
+    """
+    Transcribe one input with one model and mode.
+
+    Args:
+        case (dict): model, draft_model, minutes, mode, fingerprint, device,
+            threads, language, audio, audio_file, seed and repeat
+
+    Returns:
+        dict: The case with its measurements added
+    """
+    import torch
+
+    from utils.fingerprint import FingerprintIndex
+    from utils.segments import merge_refined_segments
+    from utils.transcription import Transcriber
+
+    torch.manual_seed(case['seed'])
+    if case['threads']:
+        torch.set_num_threads(case['threads'])
+
+    seconds = case['minutes'] * 60
+    audio = np.load(case['audio_file'])
+    progressive = case['mode'] == 'progressive'
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = FingerprintIndex(os.path.join(index_dir, 'fingerprints.sqlite')) if case['fingerprint'] else None
+        transcriber = Transcriber(fingerprint_index=index, device=case['device'])
+
+        started = time.perf_counter()
+        first_model = case['draft_model'] if progressive else case['model']
+        models = [first_model, case['model']] if progressive else [case['model']]
+        for model_size in models:
+            transcriber.get_model(model_size)
+        load_seconds = time.perf_counter() - started
+
+        options = {
+            'word_timestamps': case['mode'] != 'plain',
+            'language': case['language'],
+            'fp16': case['device'] != 'cpu'
+        }
+
+        # One-off costs (kernel selection, allocator growth) stay out of the timings
+        for model_size in models:
+            transcriber.run_whisper(model_size, audio[:WARMUP_SECONDS * SAMPLE_RATE], **options)
+
+        # transcribe() decodes one 30-second window per model.decode call; the
+        # first return of the first pass marks the first decoded window
+        first_decoded = []
+        first_pass_model = transcriber.get_model(first_model)[0]
+        decode = first_pass_model.decode
+
+        def timed_decode(*args, **kwargs):
+            result = decode(*args, **kwargs)
+            if not first_decoded:
+                first_decoded.append(time.perf_counter())
+            return result
+
+        first_pass_model.decode = timed_decode
+
+        elapsed = []
+        first_segment = []
+        first_window = []
+        for _ in range(case['repeat']):
+            first_decoded.clear()
+            started = time.perf_counter()
+            segments = transcriber.transcribe_audio(
+                first_model, CASE_TRANSCRIPTION_ID, audio, final=not progressive, **options
+            )
+            # Segments are served once the (draft) pass has finished
+            first_segment.append(time.perf_counter() - started)
+            if progressive:
+                refined = transcriber.transcribe_audio(case['model'], CASE_TRANSCRIPTION_ID, audio, **options)
+                segments = merge_refined_segments(segments, refined)
+            elapsed.append(time.perf_counter() - started)
+            first_window.append((first_decoded[0] if first_decoded else time.perf_counter()) - started)
+
+    median_elapsed = statistics.median(elapsed)
+    return dict(
+        case,
+        elapsed=round(median_elapsed, 3),
+        rtf=round(median_elapsed / seconds, 4),
+        first_segment_seconds=round(statistics.median(first_segment), 3),
+        first_window_seconds=round(statistics.median(first_window), 3),
+        load_seconds=round(load_seconds, 3),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+        segments=len(segments),
+        words=sum(len(segment.get('words', [])) for segment in segments)
+    )
+
+
+def run_case_subprocess(case):
+    """Run a case in a fresh interpreter and return its result, or an error entry."""
+    process = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.transcription', '--run-case', json.dumps(case)],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    if process.returncode != 0:
+        return dict(case, error=process.stderr.strip().splitlines()[-1:] or ['unknown error'])
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def case_key(result):
+    """Identify a case across runs."""
+    return result['model'], result['minutes'], result['mode']
+
+
+def word_timestamp_overhead(results):
+    """
+    Relative slowdown from word timestamps for each model and duration.
+
+    Returns:
+        list: Entries with model, minutes and overhead (0.25 = 25% slower)
+    """
+    measured = {case_key(result): result for result in results if 'error' not in result}
+    overhead = []
+    for (model, minutes, mode), result in measured.items():
+        plain = measured.get((model, minutes, 'plain'))
+        if mode == 'words' and plain and plain['elapsed']:
+            overhead.append({
+                'model': model,
+                'minutes': minutes,
+                'overhead': round(result['elapsed'] / plain['elapsed'] - 1, 4)
+            })
+    return overhead
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Find metrics that got worse than the baseline by more than a threshold.
+
+    Args:
+        results (list): Current case results
+        baseline (dict): A previous report
+        threshold (float): Allowed relative increase, e.g. 0.1 for 10%
+
+    Returns:
+        list: Regressions as dicts with model, minutes, mode, metric,
+        baseline, current and change
+    """
+    previous = {case_key(result): result for result in baseline['results'] if 'error' not in result}
+    regressions = []
+
+    for result in results:
+        before = previous.get(case_key(result))
+        if 'error' in result or before is None:
+            continue
+        for metric in REGRESSION_METRICS:
+            if before.get(metric) and result[metric] > before[metric] * (1 + threshold):
+                regressions.append({
+                    'model': result['model'],
+                    'minutes': result['minutes'],
+                    'mode': result['mode'],
+                    'metric': metric,
+                    'baseline': before[metric],
+                    'current': result[metric],
+                    'change': round(result[metric] / before[metric] - 1, 4)
+                })
+    return regressions
+
+
+def print_results(report):
+    """Print a results table."""
+    print(f"{'Model':<8} {'Audio':>7} {'Mode':>12} {'RTF':>8} {'First seg':>10} {'Peak RSS':>10}")
+    print("=" * 60)
+    for result in report['results']:
+        label = f"{result['model']:<8} {result['minutes']:>6g}m {result['mode']:>12}"
+        if 'error' in result:
+            print(f"{label}  failed: {' '.join(result['error'])}")
+            continue
+        print(f"{label} {result['rtf']:>8.4f} {result['first_segment_seconds']:>9.2f}s"
+              f" {result['peak_rss_mb']:>8.0f}MB")
+
+    for entry in report['word_timestamp_overhead']:
+        print(f"Word timestamp overhead {entry['model']} {entry['minutes']:g}m: {entry['overhead']:+.1%}")
+
+
+def environment_info(args):
+    """Describe the machine and libraries a report was produced with."""
+    info = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'device': args.device,
+        'threads': args.threads,
+        'audio': args.audio or f"synthetic (seed {args.seed})",
+        'draft_model': args.draft_model,
+        'fingerprint': not args.no_fingerprint,
+        'repeat': args.repeat
+    }
+    for module in ('torch', 'whisper'):
+        try:
+            info[module] = __import__(module).__version__
+        except (ImportError, AttributeError):
+            info[module] = None
+    return info
+
+
+# =============================================================================
+# Command Line
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Whisper transcription speed and memory')
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODELS,
+                        help=f"Whisper model sizes (default: {' '.join(DEFAULT_MODELS)})")
+    parser.add_argument('--durations', nargs='+', type=float, default=DEFAULT_DURATIONS,
+                        help='Audio durations in minutes (default: 1 10 60)')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES,
+                        help='plain: no word timestamps; words: as /transcribe; '
+                             'progressive: draft, refinement and merge (default: all)')
+    parser.add_argument('--draft-model', default=DEFAULT_DRAFT_MODEL,
+                        help=f"Draft model size for progressive mode (default: {DEFAULT_DRAFT_MODEL})")
+    parser.add_argument('--no-fingerprint', action='store_true',
+                        help='Skip the fingerprint lookup, as with FINGERPRINT_ENABLED off')
+    parser.add_argument('--audio', help='Fixture audio file, tiled to each duration (default: synthetic)')
+    parser.add_argument('--device', default='cpu', help='Torch device (default: cpu)')
+    parser.add_argument('--threads', type=int, default=0, help='Torch threads, 0 for the torch default')
+    parser.add_argument('--language', help='Skip language detection by fixing the language, e.g. en')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per case; the median is reported')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for synthetic audio and sampling')
+    parser.add_argument('--output', default='transcription_benchmark.json', help='Where to write the JSON report')
+    parser.add_argument('--results', help='Compare an existing report instead of running the benchmark')
+    parser.add_argument('--baseline', help='Report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative increase counted as a regression (default: 0.1)')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    if args.results:
+        with open(args.results, encoding='utf-8') as f:
+            report = json.load(f)
+    else:
+        results = []
+        with tempfile.TemporaryDirectory() as audio_dir:
+            audio_files = {}
+            for minutes in args.durations:
+                print(f"Preparing {minutes:g} min of audio", flush=True)
+                audio_files[minutes] = prepare_audio(minutes, audio_dir, fixture=args.audio, seed=args.seed)
+
+            for model in args.models:
+                for minutes in args.durations:
+                    for mode in args.modes:
+                        case = {
+                            'model': model,
+                            'draft_model': args.draft_model,
+                            'minutes': minutes,
+                            'mode': mode,
+                            'fingerprint': not args.no_fingerprint,
+                            'device': args.device,
+                            'threads': args.threads,
+                            'language': args.language,
+                            'audio': args.audio,
+                            'audio_file': audio_files[minutes],
+                            'seed': args.seed,
+                            'repeat': args.repeat
+                        }
+                        print(f"Running {model} on {minutes:g} min, mode: {mode}", flush=True)
+                        result = run_case_subprocess(case)
+                        result.pop('audio_file', None)  # Temporary, gone after the run
+                        results.append(result)
+
+        report = {
+            'environment': environment_info(args),
+            'results': results,
+            'word_timestamp_overhead': word_timestamp_overhead(results)
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    print_results(report)
+    failed = any('error' in result for result in report['results'])
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report['results'], baseline, args.threshold)
+        print(f"Compared against {args.baseline} (threshold {args.threshold:.0%})")
+        for regression in regressions:
+            print(f"REGRESSION {regression['model']} {regression['minutes']:g}m "
+                  f"{regression['mode']} {regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']} ({regression['change']:+.1%})")
+        if regressions:
+            return 1
+        print("No regressions")
+
+    return 2 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
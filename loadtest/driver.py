@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Multi-user load driver replaying listening sessions against the app
+
+Each simulated user runs sessions the way the web UI does: upload an episode,
+transcribe it (polling while it is queued or being refined), add bookmarks
+with AI comments, chat about the transcript, issue voice commands (speech
+recognition followed by command interpretation) and request a summary, with
+think time between steps.
+
+Latency is recorded per endpoint and reported as throughput and
+p50/p95/p99 of successful responses, alongside status code counts, so lane
+limits and 429s are visible without flattering the latency figures. Run the app against ``loadtest.mock_azure`` to keep everything on
+one offline machine:
+
+    python -m loadtest.driver --target http://127.0.0.1:5000 --users 20 --duration 300
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import wave
+
+import httpx
+import numpy as np
+
+from benchmarks.transcription import SAMPLE_RATE, synthesize_speech
+
+
+TERMINAL_STATUSES = ('final', 'failed')
+CHAT_QUESTIONS = [
+    'What is this episode about?',
+    'Who are the speakers?',
+    'Summarize the last few minutes.',
+    'What were the main arguments?',
+]
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Thread-safe collection of (endpoint, status, latency) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+        self.sessions_completed = 0
+        self.sessions_failed = 0
+
+    def add(self, endpoint, status, latency):
+        with self._lock:
+            self.samples.append((endpoint, status, latency))
+
+    def session_done(self, ok):
+        with self._lock:
+            if ok:
+                self.sessions_completed += 1
+            else:
+                self.sessions_failed += 1
+
+    def report(self, wall_seconds):
+        """
+        Summarize samples per endpoint.
+
+        Latency percentiles cover 2xx responses only: fast 429s and transport
+        errors would otherwise make latency look better as rejections grow.
+        Those show up in the failed and status counts instead.
+
+        Args:
+            wall_seconds (float): Duration of the run, for throughput
+
+        Returns:
+            dict: Per-endpoint count, throughput, status counts and latency
+            percentiles of successful requests in milliseconds (None if none
+            succeeded), plus session totals
+        """
+        with self._lock:
+            samples = list(self.samples)
+
+        endpoints = {}
+        for endpoint, status, latency in samples:
+            entry = endpoints.setdefault(endpoint, {'count': 0, 'latencies': [], 'statuses': {}})
+            entry['count'] += 1
+            if str(status).startswith('2'):
+                entry['latencies'].append(latency)
+            entry['statuses'][str(status)] = entry['statuses'].get(str(status), 0) + 1
+
+        def milliseconds(seconds):
+            return None if seconds is None else round(seconds * 1000, 1)
+
+        summary = {}
+        for endpoint, entry in sorted(endpoints.items()):
+            latencies = sorted(entry['latencies'])
+            summary[endpoint] = {
+                'count': entry['count'],
+                'ok': len(latencies),
+                'failed': entry['count'] - len(latencies),
+                'throughput': round(entry['count'] / wall_seconds, 3),
+                'statuses': entry['statuses'],
+                'p50_ms': milliseconds(percentile(latencies, 50)),
+                'p95_ms': milliseconds(percentile(latencies, 95)),
+                'p99_ms': milliseconds(percentile(latencies, 99)),
+                'max_ms': milliseconds(latencies[-1] if latencies else None)
+            }
+
+        return {
+            'wall_seconds': round(wall_seconds, 2),
+            'requests': len(samples),
+            'throughput': round(len(samples) / wall_seconds, 3),
+            'sessions_completed': self.sessions_completed,
+            'sessions_failed': self.sessions_failed,
+            'endpoints': summary
+        }
+
+
+# =============================================================================
+# Session Script
+# =============================================================================
+
+def wav_bytes(samples):
+    """Encode float samples as a 16kHz mono 16-bit WAV file."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class Session:
+    """
+    One simulated user session.
+
+    Args:
+        client (httpx.Client): Client bound to the app's base URL
+        recorder (Recorder): Where latencies are recorded
+        config (argparse.Namespace): Driver options
+        episode (tuple): (filename, bytes) of the audio to upload
+        voice_clip (bytes): WAV sent to speech recognition
+        rng (random.Random): Per-user random source
+    """
+
+    def __init__(self, client, recorder, config, episode, voice_clip, rng):
+        self.client = client
+        self.recorder = recorder
+        self.config = config
+        self.episode = episode
+        self.voice_clip = voice_clip
+        self.rng = rng
+        self.transcript_text = ''
+        self.chat_history = []
+
+    def request(self, endpoint, method, url, **kwargs):
+        """Send a request, record its latency under ``endpoint`` and return the response (or None)."""
+        started = time.monotonic()
+        try:
+            response = self.client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            response = None
+            status = type(e).__name__
+        self.recorder.add(endpoint, status, time.monotonic() - started)
+        return response
+
+    def think(self):
+        if self.config.think_time:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.config.think_time)
+
+    def run(self):
+        """Run the session script. Returns False if it had to stop early."""
+        if not self.config.skip_transcribe and not self.upload_and_transcribe():
+            return False
+
+        for _ in range(self.config.bookmarks):
+            self.think()
+            self.bookmark()
+
+        for _ in range(self.config.chat_turns):
+            self.think()
+            self.chat()
+
+        for _ in range(self.config.voice_commands):
+            self.think()
+            self.voice_command()
+
+        self.think()
+        self.request('POST /generate_summary', 'POST', '/generate_summary',
+                     json={'transcript_text': self.transcript_excerpt(4000)})
+        return True
+
+    def upload_and_transcribe(self):
+        filename, data = self.episode
+        response = self.request('POST /upload', 'POST', '/upload', files={'file': (filename, data, 'audio/wav')})
+        if response is None or response.status_code != 200:
+            return False
+        upload = response.json()
+
+        started = time.monotonic()
+        response = self.request('POST /transcribe', 'POST', '/transcribe', json={
+            'file_id': upload['file_id'],
+            'filename': upload['filename'],
+            'progressive': self.config.progressive
+        })
+        if response is None or response.status_code not in (200, 202):
+            return False
+        result = response.json()
+
+        # Keep polling like the UI while the job is queued or being refined
+        deadline = started + self.config.transcribe_timeout
+        while result.get('status') not in TERMINAL_STATUSES and time.monotonic() < deadline:
+            time.sleep(self.config.poll_interval)
+            response = self.request('GET /get_transcription/<id>', 'GET',
+                                    f"/get_transcription/{upload['file_id']}")
+            if response is not None and response.status_code == 200:
+                result = response.json()
+
+        if result.get('status') != 'final':
+            return False
+        self.recorder.add('transcript ready (end-to-end)', 200, time.monotonic() - started)
+        self.transcript_text = ' '.join(segment['text'] for segment in result.get('segments', []))
+        return True
+
+    def transcript_excerpt(self, length):
+        text = self.transcript_text or ' '.join(CHAT_QUESTIONS)
+        start = self.rng.randrange(max(1, len(text) - length))
+        return text[start:start + length]
+
+    def bookmark(self):
+        self.request('POST /generate_bookmark_comment', 'POST', '/generate_bookmark_comment',
+                     json={'transcript_text': self.transcript_excerpt(400), 'existing_comment': ''})
+
+    def chat(self):
+        query = self.rng.choice(CHAT_QUESTIONS)
+        response = self.request('POST /chat', 'POST', '/chat', json={
+            'query': query,
+            'transcript_context': self.transcript_excerpt(4000),
+            'chat_history': self.chat_history[-6:]
+        })
+        if response is not None and response.status_code == 200:
+            self.chat_history.append({'role': 'user', 'content': query})
+            self.chat_history.append({'role': 'assistant', 'content': response.json().get('response', '')})
+
+    def voice_command(self):
+        response = self.request('POST /recognize_speech', 'POST', '/recognize_speech',
+                                files={'audio': ('command.wav', self.voice_clip, 'audio/wav')},
+                                data={'language': 'en-US'})
+        if response is None or response.status_code != 200:
+            return
+        self.request('POST /interpret_command', 'POST', '/interpret_command', json={
+            'command': response.json().get('transcript', ''),
+            'app_state': {'isAudioLoaded': True, 'isPlaying': True, 'hasTranscript': bool(self.transcript_text)}
+        })
+
+
+# =============================================================================
+# Driver
+# =============================================================================
+
+def run_user(user_index, recorder, config, episode, voice_clip, stop_at):
+    """Run sessions for one simulated user until its quota or the deadline."""
+    rng = random.Random(config.seed + user_index)
+    time.sleep(config.ramp_up * user_index / max(1, config.users))
+
+    with httpx.Client(base_url=config.target, timeout=config.timeout) as client:
+        completed = 0
+        while time.monotonic() < stop_at and (not config.sessions or completed < config.sessions):
+            session = Session(client, recorder, config, episode, voice_clip, rng)
+            ok = session.run()
+            recorder.session_done(ok)
+            completed += 1
+            if not ok:
+                session.think()
+
+
+def print_report(report):
+    """Print the per-endpoint table."""
+    print(f"{'Endpoint':<38} {'Count':>6} {'OK':>6} {'Req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    print("=" * 86)
+    for endpoint, stats in report['endpoints'].items():
+        latencies = ''.join(
+            f" {stats[key]:>6.0f}ms" if stats[key] is not None else f" {'-':>8}"
+            for key in ('p50_ms', 'p95_ms', 'p99_ms')
+        )
+        print(f"{endpoint:<38} {stats['count']:>6} {stats['ok']:>6} {stats['throughput']:>7.2f}{latencies}")
+        failures = {status: count for status, count in stats['statuses'].items() if not status.startswith('2')}
+        if failures:
+            print(f"{'':<38} non-2xx: {', '.join(f'{status} x{count}' for status, count in failures.items())}")
+    print("=" * 86)
+    print(f"Requests: {report['requests']} in {report['wall_seconds']}s ({report['throughput']:.2f} req/s)")
+    print(f"Sessions: {report['sessions_completed']} completed, {report['sessions_failed']} stopped early")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay multi-user sessions against the app and report latency')
+    parser.add_argument('--target', default='http://127.0.0.1:5000', help='App base URL')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent simulated users (default: 10)')
+    parser.add_argument('--duration', type=float, default=300, help='Run time limit in seconds (default: 300)')
+    parser.add_argument('--sessions', type=int, default=0, help='Sessions per user, 0 for no limit')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Seconds over which users start (default: 10)')
+    parser.add_argument('--think-time', type=float, default=2, help='Mean pause between steps in seconds')
+    parser.add_argument('--audio', help='Episode to upload (default: synthetic audio)')
+    parser.add_argument('--audio-seconds', type=float, default=60, help='Length of the synthetic episode')
+    parser.add_argument('--progressive', action='store_true', help='Request progressive transcription')
+    parser.add_argument('--skip-transcribe', action='store_true', help='Only exercise the interactive routes')
+    parser.add_argument('--bookmarks', type=int, default=2, help='Bookmark comments per session')
+    parser.add_argument('--chat-turns', type=int, default=3, help='Chat messages per session')
+    parser.add_argument('--voice-commands', type=int, default=2, help='Voice commands per session')
+    parser.add_argument('--poll-interval', type=float, default=3, help='Transcription polling interval')
+    parser.add_argument('--transcribe-timeout', type=float, default=900, help='Give up on a transcription after this')
+    parser.add_argument('--timeout', type=float, default=600, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--output', help='Write the report as JSON')
+
+    config = parser.parse_args()
+
+    if config.audio:
+        with open(config.audio, 'rb') as f:
+            episode = (os.path.basename(config.audio), f.read())
+    else:
+        episode = ('episode.wav', wav_bytes(synthesize_speech(config.audio_seconds, seed=config.seed)))
+    voice_clip = wav_bytes(synthesize_speech(2, seed=config.seed + 1))
+
+    recorder = Recorder()
+    started = time.monotonic()
+    stop_at = started + config.duration
+    users = [
+        threading.Thread(target=run_user, args=(index, recorder, config, episode, voice_clip, stop_at), daemon=True)
+        for index in range(config.users)
+    ]
+
+    print(f"Running {config.users} users against {config.target} for up to {config.duration:g}s")
+    try:
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+    except KeyboardInterrupt:
+        print("Interrupted, reporting partial results")
+
+    report = recorder.report(time.monotonic() - started)
+    report['config'] = vars(config)
+    print_report(report)
+
+    if config.output:
+        with open(config.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {config.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Azure OpenAI and Azure Speech REST APIs
+
+Serves the two endpoints the app calls, so it can be load-tested offline:
+
+- ``POST /openai/deployments/<deployment>/chat/completions`` returns a chat
+  completion (a JSON action plan for command-interpreter prompts), or an SSE
+  stream of chunks when the request sets ``"stream": true``.
+- ``POST /speech/recognition/conversation/cognitiveservices/v1`` returns a
+  detailed recognition result with a voice command phrase.
+
+Latency, 429 rate limiting (random and/or above an in-flight cap) and
+streaming pace are configurable. Point the app at it with:
+
+    python -m loadtest.mock_azure --port 8900
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8900 AZURE_SPEECH_ENDPOINT=http://127.0.0.1:8900 ...
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CHAT_PATH = re.compile(r'^/openai/deployments/[^/]+/chat/completions$')
+SPEECH_PATH = '/speech/recognition/conversation/cognitiveservices/v1'
+
+VOICE_COMMANDS = [
+    'Play the audio',
+    'Pause',
+    'Skip forward thirty seconds',
+    'Go to two minutes',
+    'Add a bookmark here',
+    'Jump to the beginning and play',
+    'Set playback speed to one and a half',
+]
+
+FILLER_WORDS = (
+    'the episode discusses how teams measure latency and throughput while keeping '
+    'interactive features responsive under load and why queues need limits'
+).split()
+
+
+class MockStats:
+    """Thread-safe request counters per service and status."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.inflight = {'openai': 0, 'speech': 0}
+
+    def enter(self, service):
+        with self._lock:
+            self.inflight[service] += 1
+            return self.inflight[service]
+
+    def leave(self, service, status):
+        with self._lock:
+            self.inflight[service] -= 1
+            key = f"{service} {status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+class MockAzureHandler(BaseHTTPRequestHandler):
+    """Request handler; configuration lives on ``self.server``."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def latency(self, mean):
+        """Sample a response delay around ``mean`` seconds."""
+        jitter = self.server.jitter
+        return max(0.0, random.uniform(mean * (1 - jitter), mean * (1 + jitter)))
+
+    def rate_limited(self, inflight):
+        """Decide whether to answer this request with a 429."""
+        if self.server.max_inflight and inflight > self.server.max_inflight:
+            return True
+        return random.random() < self.server.rate_limit
+
+    def send_rate_limit(self):
+        self.send_json(429, {
+            'error': {
+                'code': '429',
+                'message': 'Requests have exceeded the rate limit of the mock service. Please retry later.'
+            }
+        }, headers={'Retry-After': str(self.server.retry_after)})
+
+    # -------------------------------------------------------------------------
+    # Routing
+    # -------------------------------------------------------------------------
+
+    def do_POST(self):
+        path = self.path.split('?', 1)[0]
+        if CHAT_PATH.match(path):
+            service, handler = 'openai', self.handle_chat
+        elif path == SPEECH_PATH:
+            service, handler = 'speech', self.handle_speech
+        else:
+            self.read_body()
+            self.send_json(404, {'error': {'code': 'NotFound', 'message': f"No mock for {path}"}})
+            return
+
+        status = 500
+        inflight = self.server.stats.enter(service)
+        try:
+            if self.headers.get('api-key') is None and self.headers.get('Ocp-Apim-Subscription-Key') is None:
+                self.read_body()
+                status = 401
+                self.send_json(401, {'error': {'code': '401', 'message': 'Missing subscription key'}})
+            elif self.rate_limited(inflight):
+                self.read_body()
+                status = 429
+                self.send_rate_limit()
+            else:
+                status = handler()
+        finally:
+            self.server.stats.leave(service, status)
+
+    def handle_chat(self):
+        """Answer a chat completions request, streamed or not."""
+        payload = json.loads(self.read_body() or b'{}')
+        messages = payload.get('messages', [])
+        system_prompt = next((m['content'] for m in messages if m.get('role') == 'system'), '')
+
+        if 'command interpreter' in system_prompt:
+            content = json.dumps({
+                'intent': 'Play audio',
+                'actions': [{'action': 'play', 'parameters': {}}],
+                'execution_mode': 'sequential'
+            })
+        else:
+            words = min(self.server.response_words, int(payload.get('max_tokens') or 800))
+            content = ' '.join(random.choice(FILLER_WORDS) for _ in range(words)).capitalize() + '.'
+
+        prompt_tokens = sum(len(str(m.get('content', '')).split()) for m in messages)
+        completion_tokens = len(content.split())
+        delay = self.latency(self.server.openai_latency)
+
+        if payload.get('stream'):
+            self.stream_chat(content, delay)
+            return 200
+
+        time.sleep(delay)
+        self.send_json(200, {
+            'id': f"chatcmpl-{uuid.uuid4().hex}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': 'mock',
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': content}
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+        return 200
+
+    def stream_chat(self, content, delay):
+        """Send a completion as server-sent events, spread over ``delay`` seconds."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        pieces = [word + ' ' for word in content.split(' ')]
+        # Time to first token, then the rest at an even pace
+        time.sleep(delay * self.server.first_token_share)
+        interval = delay * (1 - self.server.first_token_share) / max(1, len(pieces))
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': 'mock',
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        try:
+            event({'role': 'assistant'})
+            for piece in pieces:
+                event({'content': piece})
+                time.sleep(interval)
+            event({}, finish_reason='stop')
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up mid-stream, e.g. on a timeout
+
+    def handle_speech(self):
+        """Answer a short-audio recognition request in the detailed format."""
+        audio = self.read_body()
+        time.sleep(self.latency(self.server.speech_latency))
+
+        phrase = random.choice(VOICE_COMMANDS)
+        duration = max(0, (len(audio) - 44) // 32) * 10000  # 16kHz 16-bit PCM, in 100ns ticks
+        self.send_json(200, {
+            'RecognitionStatus': 'Success',
+            'Offset': 0,
+            'Duration': duration,
+            'DisplayText': phrase,
+            'NBest': [{
+                'Confidence': 0.93,
+                'Lexical': phrase.lower(),
+                'ITN': phrase.lower(),
+                'MaskedITN': phrase.lower(),
+                'Display': phrase
+            }]
+        })
+        return 200
+
+
+class MockAzureServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying the mock configuration."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, openai_latency=0.8, speech_latency=0.3, jitter=0.25,
+                 rate_limit=0.0, max_inflight=0, retry_after=1, response_words=60,
+                 first_token_share=0.2, verbose=False):
+        super().__init__(address, MockAzureHandler)
+        self.openai_latency = openai_latency
+        self.speech_latency = speech_latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.max_inflight = max_inflight
+        self.retry_after = retry_after
+        self.response_words = response_words
+        self.first_token_share = first_token_share
+        self.verbose = verbose
+        self.stats = MockStats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve mock Azure OpenAI and Azure Speech endpoints')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8900, help='Port to bind (default: 8900)')
+    parser.add_argument('--latency', type=float, default=0.8,
+                        help='Mean chat completion latency in seconds (default: 0.8)')
+    parser.add_argument('--speech-latency', type=float, default=0.3,
+                        help='Mean speech recognition latency in seconds (default: 0.3)')
+    parser.add_argument('--jitter', type=float, default=0.25,
+                        help='Latency spread as a fraction of the mean (default: 0.25)')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Fraction of requests answered with 429 (default: 0)')
+    parser.add_argument('--max-inflight', type=int, default=0,
+                        help='Concurrent requests per service before 429s, 0 for no cap')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--response-words', type=int, default=60, help='Words per chat completion')
+    parser.add_argument('--first-token-share', type=float, default=0.2,
+                        help='Share of the latency spent before the first streamed token (default: 0.2)')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+
+    server = MockAzureServer(
+        (args.host, args.port),
+        openai_latency=args.latency,
+        speech_latency=args.speech_latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        max_inflight=args.max_inflight,
+        retry_after=args.retry_after,
+        response_words=args.response_words,
+        first_token_share=args.first_token_share,
+        verbose=args.verbose
+    )
+
+    print(f"Mock Azure services listening on http://{args.host}:{args.port}")
+    print(f"  AZURE_OPENAI_ENDPOINT=http://{args.host}:{args.port}")
+    print(f"  AZURE_SPEECH_ENDPOINT=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    print("Requests served:")
+    for key, count in sorted(server.stats.counts.items()):
+        print(f"  {key}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
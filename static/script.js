@@ -87,6 +87,7 @@ document.addEventListener('DOMContentLoaded', function() {
     let currentFile = null;
     let fileId = null;
     let segments = [];
+    let refinementTimer = null;
 
     // Bookmarks
     let bookmarkCounter = 1;
@@ -120,6 +121,14 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Backend API URL - change this to match your Flask server
     const API_URL = 'http://localhost:5000';
+
+    // Progressive transcription: show a fast draft, then poll for refined segments
+    // (also used to follow jobs queued for worker nodes)
+    const PROGRESSIVE_TRANSCRIPTION = true;
+    const REFINEMENT_POLL_INTERVAL = 3000;
+    // Failed polls (network or 5xx) are retried with doubling delays before giving up
+    const POLL_MAX_RETRIES = 5;
+    const POLL_MAX_DELAY = 30000;
     
     // ========================================================================
     // EVENT LISTENERS SETUP
@@ -307,6 +316,7 @@ document.addEventListener('DOMContentLoaded', function() {
         transcriptionContainer.style.display = 'none';
         transcriptionContent.innerHTML = '';
         segments = [];
+        clearTimeout(refinementTimer);
         exportBtn.style.display = 'none';
         exportBtn.disabled = true;
         
@@ -350,18 +360,32 @@ document.addEventListener('DOMContentLoaded', function() {
             },
             body: JSON.stringify({
                 file_id: fileId,
-                filename: currentFile.name
+                filename: currentFile.name,
+                progressive: PROGRESSIVE_TRANSCRIPTION
             })
         })
         .then(response => response.json())
         .then(data => {
+            if (data.status === 'queued') {
+                // Distributed mode: a worker node picks the job up, keep the loader on
+                showMessage('Transcription queued');
+                pollTranscription(data.transcription_id);
+                return;
+            }
+
             setTranscriptionInProgress(false);
 
             if (data.segments) {
                 segments = data.segments;
                 displayTranscription(segments);
                 enablePostTranscriptionFeatures();
-                showMessage('Transcription completed');
+
+                if (data.status === 'refining') {
+                    showMessage('Draft transcription ready, refining in background');
+                    pollTranscription(data.transcription_id);
+                } else {
+                    showMessage('Transcription completed');
+                }
             } else {
                 showMessage('Error: ' + data.error);
             }
@@ -373,6 +397,113 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    /**
+     * Polls the server until a queued or refining transcription is final
+     * @param {string} transcriptionId - ID of the transcription to follow
+     * @param {number} failures - Consecutive failed polls so far
+     */
+    function pollTranscription(transcriptionId, failures = 0) {
+        clearTimeout(refinementTimer);
+
+        const delay = Math.min(REFINEMENT_POLL_INTERVAL * 2 ** failures, POLL_MAX_DELAY);
+
+        refinementTimer = setTimeout(() => {
+            fetch(`${API_URL}/get_transcription/${transcriptionId}`)
+            .then(response => response.json().then(data => ({ response, data })))
+            .then(({ response, data }) => {
+                // Ignore results for a file that is no longer loaded
+                if (transcriptionId !== fileId) return;
+
+                if (!response.ok || data.error || !data.segments) {
+                    const reason = data.error || `HTTP ${response.status}`;
+                    if (response.status >= 500) {
+                        retryPoll(transcriptionId, failures, reason);
+                    } else {
+                        stopPolling(reason);
+                    }
+                    return;
+                }
+
+                if (segments.length === 0 && data.segments.length > 0) {
+                    // First segments of a queued job
+                    setTranscriptionInProgress(false);
+                    segments = data.segments;
+                    displayTranscription(segments);
+                    enablePostTranscriptionFeatures();
+                } else {
+                    applyRefinedSegments(data.segments);
+                }
+
+                if (['queued', 'transcribing', 'refining'].includes(data.status)) {
+                    pollTranscription(transcriptionId);
+                } else if (data.status === 'final') {
+                    setTranscriptionInProgress(false);
+                    showMessage('Transcription completed');
+                } else {
+                    setTranscriptionInProgress(false);
+                    showMessage(segments.length > 0
+                        ? 'Refinement failed, keeping draft transcription'
+                        : 'Error during transcription');
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                if (transcriptionId === fileId) {
+                    retryPoll(transcriptionId, failures, error.message);
+                }
+            });
+        }, delay);
+    }
+
+    /**
+     * Polls again after a transient failure, or gives up after POLL_MAX_RETRIES
+     * @param {string} transcriptionId - ID of the transcription to follow
+     * @param {number} failures - Consecutive failed polls before this one
+     * @param {string} reason - Why the last poll failed
+     */
+    function retryPoll(transcriptionId, failures, reason) {
+        if (failures + 1 > POLL_MAX_RETRIES) {
+            stopPolling(reason);
+        } else {
+            pollTranscription(transcriptionId, failures + 1);
+        }
+    }
+
+    /**
+     * Stops following a transcription and reports why
+     * @param {string} reason - Error returned by the server or the network
+     */
+    function stopPolling(reason) {
+        clearTimeout(refinementTimer);
+        setTranscriptionInProgress(false);
+        showMessage(segments.length > 0
+            ? `Could not refresh transcription (${reason}), keeping draft transcription`
+            : `Error during transcription: ${reason}`);
+    }
+
+    /**
+     * Swaps segments with a newer version into the displayed transcript in place.
+     * Segment times do not change, so bookmarks keep pointing at the same moments.
+     * @param {Array} refinedSegments - Segments returned by the server
+     */
+    function applyRefinedSegments(refinedSegments) {
+        if (refinedSegments.length !== segments.length) {
+            segments = refinedSegments;
+            displayTranscription(segments);
+            return;
+        }
+
+        refinedSegments.forEach((segment, index) => {
+            if ((segment.version || 0) <= (segments[index].version || 0)) return;
+
+            segments[index] = segment;
+            const textEl = document.querySelector(`#segment-${index} .segment-text`);
+            if (textEl) {
+                textEl.textContent = segment.text;
+            }
+        });
+    }
+
     /**
      * Sets UI state for transcription in progress
      * @param {boolean} inProgress - Whether transcription is in progress
@@ -0,0 +1,71 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from utils.fingerprint import MAX_HASH_EPISODES, FingerprintIndex
+
+
+VOCABULARY = 5000  # Distinct hashes shared by all synthetic episodes
+EPISODE_HASHES = 3000
+EPISODE_FRAMES = 20000
+
+
+def unrelated_episode(rng):
+    """Hashes drawn from the shared vocabulary at random frames, so every hash ends up common."""
+    hashes = rng.integers(0, VOCABULARY, EPISODE_HASHES, dtype=np.int64)
+    offsets = rng.integers(0, EPISODE_FRAMES, EPISODE_HASHES, dtype=np.int64)
+    return hashes, offsets
+
+
+@pytest.fixture
+def index(tmp_path):
+    return FingerprintIndex(str(tmp_path / 'fingerprints.sqlite'))
+
+
+def test_new_intro_matches_after_many_unrelated_episodes(index):
+    rng = np.random.default_rng(0)
+    for number in range(50):
+        index.add(f"unrelated-{number}", *unrelated_episode(rng))
+
+    # A new show's intro, made only of hashes every earlier episode already uses
+    intro_hashes = rng.integers(0, VOCABULARY, 400, dtype=np.int64)
+    intro_offsets = np.arange(400, dtype=np.int64) * 2
+
+    body_hashes, body_offsets = unrelated_episode(rng)
+    index.add('pilot', np.concatenate((intro_hashes, body_hashes)),
+              np.concatenate((intro_offsets + 1000, body_offsets + 2000)))
+
+    matches = index.find_matches(intro_hashes, intro_offsets, exclude='second-episode')
+
+    assert [match['transcription_id'] for match in matches] == ['pilot']
+    assert matches[0]['hits'] >= 380
+    assert matches[0]['offset'] == pytest.approx(1000 * 512 / 16000)
+
+
+def test_hashes_keep_their_newest_episodes(index, tmp_path):
+    for number in range(MAX_HASH_EPISODES + 3):
+        index.add(f"episode-{number}", np.array([7, 7, 9]), np.array([0, 5, 10]))
+
+    conn = sqlite3.connect(str(tmp_path / 'fingerprints.sqlite'))
+    stored = conn.execute("""
+        SELECT DISTINCT e.transcription_id FROM hashes h JOIN episodes e ON e.id = h.episode_id
+        WHERE h.hash = 7 ORDER BY e.id
+    """).fetchall()
+    counts = dict(conn.execute("SELECT hash, episodes FROM hash_counts"))
+    conn.close()
+
+    assert [name for name, in stored] == [f"episode-{number}" for number in range(3, MAX_HASH_EPISODES + 3)]
+    assert counts == {7: MAX_HASH_EPISODES, 9: MAX_HASH_EPISODES}
+
+
+def test_replacing_an_episode_keeps_counts_consistent(index, tmp_path):
+    index.add('episode-a', np.array([1, 2]), np.array([0, 1]))
+    index.add('episode-b', np.array([2, 3]), np.array([0, 1]))
+    index.add('episode-a', np.array([3]), np.array([0]))
+
+    conn = sqlite3.connect(str(tmp_path / 'fingerprints.sqlite'))
+    counts = dict(conn.execute("SELECT hash, episodes FROM hash_counts"))
+    conn.close()
+
+    assert counts == {2: 1, 3: 2}
@@ -0,0 +1,134 @@
+import multiprocessing
+import time
+
+import pytest
+
+from utils.job_ledger import JobLedger
+
+
+LEASE_SECONDS = 0.2
+
+
+@pytest.fixture
+def ledger_path(tmp_path):
+    return str(tmp_path / 'jobs.sqlite')
+
+
+def test_lease_is_stolen_after_expiry(ledger_path):
+    ledger = JobLedger(ledger_path, lease_seconds=LEASE_SECONDS)
+    ledger.enqueue('job-1', 'episode.mp3')
+
+    first = ledger.claim('worker-a')
+    assert first['job_id'] == 'job-1'
+    assert ledger.claim('worker-b') is None
+
+    time.sleep(LEASE_SECONDS * 1.5)
+    stolen = ledger.claim('worker-b')
+
+    assert stolen['job_id'] == 'job-1'
+    assert stolen['worker_id'] == 'worker-b'
+    assert stolen['attempts'] == 2
+
+
+def test_heartbeat_keeps_the_lease(ledger_path):
+    ledger = JobLedger(ledger_path, lease_seconds=LEASE_SECONDS)
+    ledger.enqueue('job-1', 'episode.mp3')
+    ledger.claim('worker-a')
+
+    for _ in range(3):
+        time.sleep(LEASE_SECONDS / 2)
+        assert ledger.heartbeat('job-1', 'worker-a')
+
+    assert ledger.claim('worker-b') is None
+
+
+def test_stale_owner_cannot_complete(ledger_path):
+    ledger = JobLedger(ledger_path, lease_seconds=LEASE_SECONDS)
+    ledger.enqueue('job-1', 'episode.mp3')
+    ledger.claim('worker-a')
+    time.sleep(LEASE_SECONDS * 1.5)
+    ledger.claim('worker-b')
+
+    assert not ledger.complete('job-1', 'worker-a')
+    assert not ledger.heartbeat('job-1', 'worker-a')
+    assert not ledger.set_stage('job-1', 'worker-a', 'refining')
+    assert not ledger.fail('job-1', 'worker-a', 'boom')
+    assert ledger.get('job-1')['status'] == 'running'
+
+    assert ledger.complete('job-1', 'worker-b')
+    job = ledger.get('job-1')
+    assert job['status'] == 'done'
+    assert job['worker_id'] == 'worker-b'
+
+
+def test_failures_are_retried_until_max_attempts(ledger_path):
+    ledger = JobLedger(ledger_path, max_attempts=2)
+    ledger.enqueue('job-1', 'episode.mp3')
+
+    ledger.claim('worker-a')
+    assert ledger.fail('job-1', 'worker-a', 'first error')
+    assert ledger.get('job-1')['status'] == 'pending'
+
+    assert ledger.claim('worker-b')['attempts'] == 2
+    assert ledger.fail('job-1', 'worker-b', 'second error')
+
+    job = ledger.get('job-1')
+    assert job['status'] == 'failed'
+    assert job['error'] == 'second error'
+    assert ledger.claim('worker-c') is None
+
+
+def test_expired_leases_fail_after_max_attempts(ledger_path):
+    ledger = JobLedger(ledger_path, lease_seconds=LEASE_SECONDS, max_attempts=2)
+    ledger.enqueue('job-1', 'episode.mp3')
+
+    ledger.claim('worker-a')
+    time.sleep(LEASE_SECONDS * 1.5)
+    ledger.claim('worker-b')
+    time.sleep(LEASE_SECONDS * 1.5)
+
+    assert ledger.claim('worker-c') is None
+    job = ledger.get('job-1')
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Lease expired too many times'
+
+
+def claim_until_empty(ledger_path, worker_id, start, results):
+    """Claim and complete jobs until none are left; report the claimed IDs."""
+    ledger = JobLedger(ledger_path, lease_seconds=60)
+    start.wait()
+    claimed = []
+    while True:
+        job = ledger.claim(worker_id)
+        if job is None:
+            break
+        claimed.append(job['job_id'])
+        assert ledger.complete(job['job_id'], worker_id)
+    results.put((worker_id, claimed))
+
+
+def test_no_duplicate_claims_across_processes(ledger_path):
+    ledger = JobLedger(ledger_path)
+    job_ids = [f"job-{index:03d}" for index in range(200)]
+    for job_id in job_ids:
+        ledger.enqueue(job_id, 'episode.mp3')
+
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=claim_until_empty, args=(ledger_path, f"worker-{index}", start, results))
+        for index in range(6)
+    ]
+    for worker in workers:
+        worker.start()
+    start.set()
+
+    claimed = dict(results.get(timeout=120) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    all_claims = [job_id for worker_claims in claimed.values() for job_id in worker_claims]
+    assert len(all_claims) == len(set(all_claims))
+    assert sorted(all_claims) == job_ids
+    assert ledger.counts() == {'done': 200}
@@ -0,0 +1,27 @@
+from loadtest.driver import Recorder
+
+
+def test_latency_percentiles_ignore_rejected_requests():
+    recorder = Recorder()
+    for index in range(10):
+        recorder.add('/chat', 200, 1.0 + index * 0.1)
+    for _ in range(90):
+        recorder.add('/chat', 429, 0.001)
+    recorder.add('/chat', 'ConnectError', 0.0005)
+
+    stats = recorder.report(wall_seconds=10)['endpoints']['/chat']
+
+    assert (stats['count'], stats['ok'], stats['failed']) == (101, 10, 91)
+    assert stats['statuses'] == {'200': 10, '429': 90, 'ConnectError': 1}
+    assert stats['p50_ms'] == 1400.0
+    assert stats['max_ms'] == 1900.0
+
+
+def test_endpoint_without_successes_has_no_latency():
+    recorder = Recorder()
+    recorder.add('/generate_summary', 429, 0.002)
+
+    stats = recorder.report(wall_seconds=1)['endpoints']['/generate_summary']
+
+    assert stats['p50_ms'] is None
+    assert stats['max_ms'] is None
@@ -0,0 +1,32 @@
+import os
+import time
+
+from utils.metrics import Registry, SamplingProfiler, escape_label_value, format_labels
+
+
+def test_label_values_are_escaped():
+    assert escape_label_value('C:\\path "quoted"\nnext') == 'C:\\\\path \\"quoted\\"\\nnext'
+    assert format_labels({'route': '/chat', 'status': 200}) == '{route="/chat",status="200"}'
+    assert format_labels({}) == ''
+
+
+def test_rendered_counter_uses_escaped_labels():
+    registry = Registry()
+    counter = registry.counter('requests', 'Requests', ['route'])
+    counter.inc(route='/say "hi"')
+
+    assert 'requests_total{route="/say \\"hi\\""} 1' in registry.render()
+
+
+def test_profiles_of_one_route_in_the_same_second_are_kept_apart(tmp_path):
+    profiler = SamplingProfiler(interval=0.001, window=10, output_dir=str(tmp_path))
+    started = time.monotonic()
+    profiler.start()
+    time.sleep(0.05)
+    finished = time.monotonic()
+
+    paths = {profiler.dump('/chat', started, finished) for _ in range(3)}
+    profiler.stop()
+
+    assert len(paths) == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths)
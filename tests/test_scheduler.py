@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.scheduler import Lane, LaneSaturated, Scheduler
+
+
+def test_full_queue_is_rejected_with_a_retry_hint():
+    async def scenario():
+        lane = Lane('interactive', concurrency=1, max_queue=1)
+        await lane.acquire_async()
+        queued = asyncio.ensure_future(lane.acquire_async())
+        await asyncio.sleep(0)
+
+        with pytest.raises(LaneSaturated) as rejected:
+            await lane.acquire_async()
+
+        assert rejected.value.lane == 'interactive'
+        assert rejected.value.retry_after >= 1
+        assert lane.stats()['rejected'] == 1
+
+        lane.release(time.monotonic())
+        await queued
+        assert lane.stats()['active'] == 1
+        assert lane.stats()['waiting'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_internal_work_queues_past_the_limit():
+    async def scenario():
+        lane = Lane('bulk', concurrency=1, max_queue=0)
+        await lane.acquire_async()
+        follow_up = asyncio.ensure_future(lane.acquire_async(admit=False))
+        await asyncio.sleep(0)
+
+        with pytest.raises(LaneSaturated):
+            await lane.acquire_async()
+        assert lane.waiting == 1
+
+        lane.release()
+        await follow_up
+
+    asyncio.run(scenario())
+
+
+def test_queued_work_times_out():
+    async def scenario():
+        lane = Lane('interactive', concurrency=1, max_queue=4, queue_timeout=0.1)
+        await lane.acquire_async()
+
+        started = time.monotonic()
+        with pytest.raises(LaneSaturated):
+            await lane.acquire_async()
+
+        assert 0.1 <= time.monotonic() - started < 1
+        assert lane.stats()['waiting'] == 0
+        assert lane.stats()['rejected'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_thread_waiter_times_out():
+    lane = Lane('interactive', concurrency=1, max_queue=4, queue_timeout=0.1)
+    lane.acquire()
+
+    with pytest.raises(LaneSaturated):
+        lane.acquire()
+    assert lane.waiting == 0
+
+
+def test_release_from_another_thread_wakes_a_waiting_coroutine():
+    async def scenario():
+        lane = Lane('bulk', concurrency=1, max_queue=4)
+        await lane.acquire_async()
+        releaser = threading.Timer(0.05, lane.release, args=(time.monotonic(),))
+        releaser.start()
+
+        started = time.monotonic()
+        await asyncio.wait_for(lane.acquire_async(), timeout=1)
+        releaser.join()
+
+        assert time.monotonic() - started < 0.5
+        assert lane.stats()['active'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_waiters_are_served_in_arrival_order():
+    async def scenario():
+        lane = Lane('bulk', concurrency=1, max_queue=10)
+        await lane.acquire_async()
+        order = []
+
+        async def coroutine_waiter(name):
+            await lane.acquire_async()
+            order.append(name)
+            lane.release()
+
+        def thread_waiter(name):
+            lane.acquire()
+            order.append(name)
+            lane.release()
+
+        first = asyncio.ensure_future(coroutine_waiter('coroutine-1'))
+        await asyncio.sleep(0.01)
+        thread = threading.Thread(target=thread_waiter, args=('thread',))
+        thread.start()
+        while lane.waiting < 2:
+            await asyncio.sleep(0.001)
+        second = asyncio.ensure_future(coroutine_waiter('coroutine-2'))
+        await asyncio.sleep(0.01)
+
+        lane.release()
+        await asyncio.gather(first, second)
+        await asyncio.to_thread(thread.join)
+
+        assert order == ['coroutine-1', 'thread', 'coroutine-2']
+        assert lane.stats()['active'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def scenario():
+        lane = Lane('interactive', concurrency=1, max_queue=4)
+        await lane.acquire_async()
+        cancelled = asyncio.ensure_future(lane.acquire_async())
+        await asyncio.sleep(0)
+
+        # The slot is handed over, but the waiter is cancelled before it resumes
+        lane.release()
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        assert lane.stats()['active'] == 0
+        await asyncio.wait_for(lane.acquire_async(), timeout=1)
+
+    asyncio.run(scenario())
+
+
+def test_limit_holds_a_slot_for_the_handler():
+    scheduler = Scheduler(Lane('interactive', concurrency=1, max_queue=0))
+    seen = []
+
+    @scheduler.limit('interactive')
+    async def handler():
+        seen.append(scheduler.lane('interactive').stats()['active'])
+        return 'ok'
+
+    assert asyncio.run(handler()) == 'ok'
+    assert seen == [1]
+    assert scheduler.stats()['interactive']['active'] == 0
@@ -0,0 +1,91 @@
+from utils.segments import merge_refined_segments
+
+
+def word(text, start, end):
+    return {'word': text, 'start': start, 'end': end}
+
+
+def draft_segment(index, start, end, text):
+    return {'id': index, 'version': 1, 'start': start, 'end': end, 'text': text, 'words': []}
+
+
+def test_refined_words_are_projected_onto_draft_boundaries():
+    draft = [draft_segment(0, 0.0, 2.0, 'hello word'), draft_segment(1, 2.0, 4.0, 'how are you')]
+    refined = [{
+        'start': 0.0,
+        'end': 4.0,
+        'text': 'hello world how are you',
+        'words': [
+            word(' hello', 0.1, 0.5), word(' world', 0.6, 1.9),
+            word(' how', 2.1, 2.4), word(' are', 2.5, 2.8), word(' you', 2.9, 3.5)
+        ]
+    }]
+
+    merged = merge_refined_segments(draft, refined)
+
+    assert [segment['text'] for segment in merged] == ['hello world', 'how are you']
+    assert [(segment['start'], segment['end']) for segment in merged] == [(0.0, 2.0), (2.0, 4.0)]
+    assert merged[0]['version'] == 2
+    assert [w['word'] for w in merged[0]['words']] == [' hello', ' world']
+
+
+def test_unchanged_segments_keep_their_version():
+    draft = [draft_segment(0, 0.0, 2.0, 'same text')]
+    refined = [{'start': 0.0, 'end': 2.0, 'text': 'same text',
+                'words': [word(' same', 0.0, 0.8), word(' text', 0.9, 1.5)]}]
+
+    merged = merge_refined_segments(draft, refined)
+
+    assert merged[0] is draft[0]
+    assert merged[0]['version'] == 1
+
+
+def test_word_straddling_a_boundary_goes_by_its_midpoint():
+    draft = [draft_segment(0, 0.0, 2.0, 'a'), draft_segment(1, 2.0, 4.0, 'b')]
+    refined = [{'start': 0.0, 'end': 4.0, 'text': 'a b',
+                'words': [word(' a', 1.5, 2.3), word(' b', 1.9, 3.0)]}]
+
+    merged = merge_refined_segments(draft, refined)
+
+    assert merged[0]['text'] == 'a'
+    assert merged[1]['text'] == 'b'
+
+
+def test_words_before_the_first_draft_segment_join_it():
+    draft = [draft_segment(0, 1.0, 3.0, 'later')]
+    refined = [{'start': 0.0, 'end': 3.0, 'text': 'early later',
+                'words': [word(' early', 0.0, 0.4), word(' later', 1.2, 2.0)]}]
+
+    merged = merge_refined_segments(draft, refined)
+
+    assert merged[0]['text'] == 'early later'
+    assert merged[0]['version'] == 2
+
+
+def test_segments_without_words_are_placed_whole():
+    draft = [draft_segment(0, 0.0, 2.0, 'one'), draft_segment(1, 2.0, 4.0, 'too')]
+    refined = [{'start': 0.0, 'end': 2.0, 'text': 'one'}, {'start': 2.0, 'end': 4.0, 'text': 'two'}]
+
+    merged = merge_refined_segments(draft, refined)
+
+    assert [segment['text'] for segment in merged] == ['one', 'two']
+    assert [segment['version'] for segment in merged] == [1, 2]
+
+
+def test_draft_segments_without_refined_words_become_empty():
+    draft = [draft_segment(0, 0.0, 2.0, 'noise'), draft_segment(1, 2.0, 4.0, 'speech')]
+    refined = [{'start': 2.0, 'end': 4.0, 'text': 'speech', 'words': [word(' speech', 2.2, 3.0)]}]
+
+    merged = merge_refined_segments(draft, refined)
+
+    assert merged[0]['text'] == ''
+    assert merged[0]['version'] == 2
+    assert merged[1] is draft[1]
+
+
+def test_empty_draft_takes_refined_segments():
+    refined = [{'id': 0, 'version': 1, 'start': 0.0, 'end': 1.0, 'text': 'hi', 'words': []}]
+
+    merged = merge_refined_segments([], refined)
+
+    assert merged == [dict(refined[0], version=2)]
@@ -0,0 +1,148 @@
+import json
+import os
+
+import pytest
+
+from utils import storage as storage_module
+from utils.storage import StorageManager
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return StorageManager(
+        str(tmp_path / 'uploads'),
+        str(tmp_path / 'transcriptions'),
+        str(tmp_path / 'storage.sqlite'),
+        cold_after_seconds=0
+    )
+
+
+def write_document(storage, transcription_id, text, status='final'):
+    document = {'status': status, 'filename': 'episode.mp3', 'segments': [{'id': 0, 'text': text}]}
+    storage.write_transcript(transcription_id, json.dumps(document), status=status)
+
+
+def test_compression_skips_drafts(storage):
+    pytest.importorskip('zstandard')
+    write_document(storage, 'draft01', 'draft', status='refining')
+    write_document(storage, 'final01', 'final')
+
+    compressed = storage.compress_cold_transcripts()
+
+    assert [os.path.basename(path) for path in compressed] == ['final01_transcription.json.zst']
+    assert os.path.exists(storage.transcript_path('draft01'))
+
+
+def test_compression_keeps_a_transcript_rewritten_meanwhile(storage, monkeypatch):
+    zstandard = pytest.importorskip('zstandard')
+    write_document(storage, 'episode1', 'old text')
+    compressor_class = zstandard.ZstdCompressor
+
+    class RacingCompressor:
+        def __init__(self, **options):
+            self.compressor = compressor_class(**options)
+
+        def compress(self, data):
+            # A resumed refinement lands after the old version was read
+            write_document(storage, 'episode1', 'new text')
+            return self.compressor.compress(data)
+
+    monkeypatch.setattr(storage_module.zstandard, 'ZstdCompressor', RacingCompressor)
+
+    assert storage.compress_cold_transcripts() == []
+    assert json.loads(storage.read_transcript('episode1'))['segments'][0]['text'] == 'new text'
+    assert not os.path.exists(storage.transcript_path('episode1') + '.zst')
+
+
+def add_upload(storage, file_id, size, age):
+    path = storage.upload_path(file_id, 'episode.mp3')
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    accessed = 1_000_000 - age
+    os.utime(path, (accessed, accessed))
+    return path
+
+
+def test_quota_evicts_only_audio_with_a_final_transcript(tmp_path):
+    storage = StorageManager(
+        str(tmp_path / 'uploads'),
+        str(tmp_path / 'transcriptions'),
+        str(tmp_path / 'storage.sqlite'),
+        upload_quota_bytes=250,
+        can_evict=lambda file_id: file_id != 'queued01'
+    )
+    paths = {
+        'draft001': add_upload(storage, 'draft001', 100, age=500),
+        'queued01': add_upload(storage, 'queued01', 100, age=400),
+        'notrans1': add_upload(storage, 'notrans1', 100, age=300),
+        'oldfinal': add_upload(storage, 'oldfinal', 100, age=200),
+        'newfinal': add_upload(storage, 'newfinal', 100, age=100),
+    }
+    write_document(storage, 'draft001', 'draft', status='refining')
+    write_document(storage, 'queued01', 'final')
+    write_document(storage, 'oldfinal', 'final')
+    write_document(storage, 'newfinal', 'final')
+    storage.scan()
+
+    evicted = storage.enforce_quota()
+
+    # 500 bytes against a 250 byte quota: both final, evictable files go, oldest first
+    assert evicted == [paths['oldfinal'], paths['newfinal']]
+    assert all(os.path.exists(paths[file_id]) for file_id in ('draft001', 'queued01', 'notrans1'))
+    assert storage.report()['audio'] == {
+        'files': 3, 'bytes': 300, 'compressed': 0, 'oldest_access': 1_000_000 - 500
+    }
+
+
+def test_quota_leaves_audio_alone_within_the_limit(tmp_path):
+    storage = StorageManager(
+        str(tmp_path / 'uploads'),
+        str(tmp_path / 'transcriptions'),
+        str(tmp_path / 'storage.sqlite'),
+        upload_quota_bytes=1000
+    )
+    add_upload(storage, 'episode1', 100, age=100)
+    write_document(storage, 'episode1', 'final')
+    storage.scan()
+
+    assert storage.enforce_quota() == []
+
+
+def test_compressed_transcripts_read_back_unchanged(storage):
+    pytest.importorskip('zstandard')
+    write_document(storage, 'episode1', 'some text')
+    original = storage.read_transcript('episode1')
+
+    (compressed_path,) = storage.compress_cold_transcripts()
+
+    assert not os.path.exists(storage.transcript_path('episode1'))
+    assert storage.read_transcript('episode1') == original
+    assert storage.report()['transcript']['compressed'] == 1
+
+    # Writing again replaces the compressed copy
+    write_document(storage, 'episode1', 'other text')
+    assert not os.path.exists(compressed_path)
+    assert json.loads(storage.read_transcript('episode1'))['segments'][0]['text'] == 'other text'
+
+
+def test_scan_catalogs_untracked_files_and_forgets_vanished_ones(storage):
+    path = add_upload(storage, 'episode1', 100, age=50)
+    transcript_path = storage.transcript_path('episode1')
+    with open(transcript_path, 'w', encoding='utf-8') as f:
+        f.write('[]')
+    with open(transcript_path + '.abc.tmp', 'w', encoding='utf-8') as f:
+        f.write('partial')
+
+    storage.scan()
+    report = storage.report()
+    assert report['audio']['files'] == 1
+    assert report['audio']['oldest_access'] == 1_000_000 - 50
+    assert report['transcript']['files'] == 1
+    assert storage.transcript_status('episode1') == 'final'
+
+    os.remove(path)
+    os.remove(transcript_path)
+    storage.scan()
+
+    assert 'audio' not in storage.report()
+    assert storage.transcript_counts() == {}
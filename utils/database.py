@@ -0,0 +1,39 @@
+"""
+SQLite connections for the catalogs kept next to uploads and transcripts
+
+The job ledger, fingerprint index and storage catalog may live on shared
+network storage, so they keep SQLite's default rollback journal: WAL needs
+shared memory that network filesystems do not provide.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+
+BUSY_TIMEOUT = 30  # Seconds to wait for another connection's lock
+
+
+@contextmanager
+def connect(db_path, begin=None, row_factory=None):
+    """
+    Open a connection for one transaction, commit on success and always close it.
+
+    Args:
+        db_path (str): Path of the database
+        begin (str): Statement opening the transaction up front, e.g.
+            "BEGIN IMMEDIATE" to take the write lock before reading; by
+            default sqlite3 opens one before the first write
+        row_factory (callable): Optional row factory, e.g. ``sqlite3.Row``
+
+    Yields:
+        sqlite3.Connection: The open connection
+    """
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, isolation_level=None if begin else '')
+    conn.row_factory = row_factory
+    try:
+        with conn:
+            if begin:
+                conn.execute(begin)
+            yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,363 @@
+"""
+Acoustic fingerprinting for audio that recurs across episodes
+
+Show intros, sponsor reads and outros repeat from episode to episode. This
+module fingerprints decoded PCM with spectral-peak pair hashing: the strongest
+peaks of a short-time spectrum are paired with nearby later peaks, and every
+pair (f1, f2, dt) becomes a hash anchored at the time of its first peak.
+
+Hashes are kept in an incremental SQLite index, so a new episode is matched
+against all earlier ones with indexed joins. Matching hashes that agree on a
+time offset mark a region of the new episode that was heard before. A hash is
+stored for its most recent few episodes only: a recurring segment is still
+matched through its latest airings, older copies add nothing a match could
+use, and dropping them keeps lookups for the most common content bounded as
+the catalogue grows without ever turning new content away.
+"""
+
+import time
+
+import numpy as np
+
+from utils.database import connect
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+SAMPLE_RATE = 16000  # Whisper decodes audio to 16kHz mono
+WINDOW_SIZE = 1024
+HOP_SIZE = 512
+FRAME_SECONDS = HOP_SIZE / SAMPLE_RATE
+
+# Frequency bands (in FFT bins) searched for one peak each per frame
+FREQUENCY_BANDS = [(8, 16), (16, 32), (32, 64), (64, 128), (128, 256), (256, 512)]
+PEAK_NEIGHBORHOOD = 5  # Frames on each side a peak must dominate in its band
+SILENCE_FLOOR = 0.5  # Minimum log-magnitude for a peak to count
+FRAMES_PER_BLOCK = 2048  # Frames transformed at once, bounds FFT memory
+
+# Peak pairing
+PAIR_OFFSETS = range(1, 7)  # Pair each peak with the next N peaks...
+MAX_PAIR_FRAMES = 64  # ...that fall within ~2 seconds after it
+
+# Matching
+MIN_DELTA_HITS = 10  # Hits on one offset before it is considered at all
+MIN_MATCH_HASHES = 20  # Hits a region needs to be accepted
+MAX_GAP_FRAMES = int(4.0 / FRAME_SECONDS)  # Pauses a region may span
+MIN_REGION_FRAMES = int(5.0 / FRAME_SECONDS)
+MAX_HASH_EPISODES = 8  # Most recent episodes a hash is stored for; older ones are dropped
+MAX_CANDIDATES = 64  # Strongest (episode, offset) pairs examined per query
+
+
+# =============================================================================
+# Fingerprint Extraction
+# =============================================================================
+
+def find_peaks(samples):
+    """
+    Find spectral peaks in mono audio.
+
+    Args:
+        samples (numpy.ndarray): 16kHz mono float samples
+
+    Returns:
+        tuple: (frames, bins) arrays of peak positions, sorted by frame
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < WINDOW_SIZE:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    frame_count = 1 + (len(samples) - WINDOW_SIZE) // HOP_SIZE
+    window = np.hanning(WINDOW_SIZE).astype(np.float32)
+    band_max = np.empty((frame_count, len(FREQUENCY_BANDS)), dtype=np.float32)
+    band_bin = np.empty((frame_count, len(FREQUENCY_BANDS)), dtype=np.int64)
+
+    # Strongest bin per band per frame, computed block by block
+    for block_start in range(0, frame_count, FRAMES_PER_BLOCK):
+        block_end = min(block_start + FRAMES_PER_BLOCK, frame_count)
+        indices = (np.arange(block_start, block_end)[:, None] * HOP_SIZE
+                   + np.arange(WINDOW_SIZE)[None, :])
+        spectrum = np.log1p(np.abs(np.fft.rfft(samples[indices] * window, axis=1)))
+
+        for band_index, (low, high) in enumerate(FREQUENCY_BANDS):
+            band = spectrum[:, low:high]
+            bins = band.argmax(axis=1)
+            band_bin[block_start:block_end, band_index] = bins + low
+            band_max[block_start:block_end, band_index] = band[np.arange(len(band)), bins]
+
+    # Keep peaks that stand out within their frame and dominate their band over time
+    padded = np.pad(band_max, ((PEAK_NEIGHBORHOOD, PEAK_NEIGHBORHOOD), (0, 0)), constant_values=-np.inf)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * PEAK_NEIGHBORHOOD + 1, axis=0)
+    is_local_max = band_max >= windows.max(axis=-1)
+    is_strong = (band_max >= band_max.mean(axis=1, keepdims=True)) & (band_max > SILENCE_FLOOR)
+
+    frames, bands = np.nonzero(is_local_max & is_strong)
+    return frames, band_bin[frames, bands]
+
+
+def fingerprint_audio(samples):
+    """
+    Compute peak-pair hashes for mono audio.
+
+    Args:
+        samples (numpy.ndarray): 16kHz mono float samples
+
+    Returns:
+        tuple: (hashes, offsets) int64 arrays; offsets are anchor frame indices
+    """
+    frames, bins = find_peaks(samples)
+    hashes = []
+    offsets = []
+
+    for pair_offset in PAIR_OFFSETS:
+        if pair_offset >= len(frames):
+            break
+        dt = frames[pair_offset:] - frames[:-pair_offset]
+        valid = (dt >= 1) & (dt <= MAX_PAIR_FRAMES)
+        anchor_bins = bins[:-pair_offset][valid]
+        target_bins = bins[pair_offset:][valid]
+        hashes.append((anchor_bins << 20) | (target_bins << 10) | dt[valid])
+        offsets.append(frames[:-pair_offset][valid])
+
+    if not hashes:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(hashes), np.concatenate(offsets)
+
+
+def find_regions(candidate_ids, query_offsets):
+    """
+    Split the hits of each candidate offset into regions.
+
+    All hits are sorted once by candidate and query frame; a region ends where
+    the candidate changes or the hits pause for longer than MAX_GAP_FRAMES.
+
+    Args:
+        candidate_ids (numpy.ndarray): Candidate (episode, offset) pair of each hit
+        query_offsets (numpy.ndarray): Query frame of each hit
+
+    Returns:
+        list: Regions as (candidate_id, start_frame, end_frame, hits)
+    """
+    if len(candidate_ids) == 0:
+        return []
+
+    order = np.lexsort((query_offsets, candidate_ids))
+    candidate_ids = candidate_ids[order]
+    query_offsets = query_offsets[order]
+
+    breaks = np.nonzero(
+        (np.diff(candidate_ids) != 0) | (np.diff(query_offsets) > MAX_GAP_FRAMES)
+    )[0] + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(candidate_ids)])) - 1
+    counts = ends - starts + 1
+    keep = (counts >= MIN_MATCH_HASHES) & (query_offsets[ends] - query_offsets[starts] >= MIN_REGION_FRAMES)
+
+    return [
+        (int(candidate_ids[first]), int(query_offsets[first]), int(query_offsets[last]), int(count))
+        for first, last, count in zip(starts[keep], ends[keep], counts[keep])
+    ]
+
+
+# =============================================================================
+# Fingerprint Index
+# =============================================================================
+
+class FingerprintIndex:
+    """
+    SQLite-backed index of episode fingerprints.
+
+    Hashes live in a WITHOUT ROWID table clustered on the hash value, so each
+    lookup is a range scan and the index stays fast as episodes are added. The
+    hash_counts table tracks how many episodes each hash is stored for, so
+    common hashes can be trimmed to their MAX_HASH_EPISODES newest episodes.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with connect(self.db_path) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS episodes (
+                    id INTEGER PRIMARY KEY,
+                    transcription_id TEXT UNIQUE NOT NULL,
+                    frames INTEGER NOT NULL,
+                    added_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS hashes (
+                    hash INTEGER NOT NULL,
+                    episode_id INTEGER NOT NULL,
+                    frame INTEGER NOT NULL,
+                    PRIMARY KEY (hash, episode_id, frame)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS hash_counts (
+                    hash INTEGER PRIMARY KEY,
+                    episodes INTEGER NOT NULL
+                );
+            """)
+
+    def add(self, transcription_id, hashes, offsets):
+        """
+        Add or replace the fingerprints of an episode.
+
+        Episode IDs grow with every insert, so where a hash is already stored
+        for MAX_HASH_EPISODES episodes, its oldest episode is dropped to make
+        room for this one.
+
+        Args:
+            transcription_id (str): Transcription the fingerprints belong to
+            hashes (numpy.ndarray): Peak-pair hashes
+            offsets (numpy.ndarray): Anchor frame of each hash
+        """
+        frames = int(offsets.max()) + 1 if len(offsets) else 0
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT id FROM episodes WHERE transcription_id = ?", (transcription_id,)
+            ).fetchone()
+            if row:
+                conn.execute("""
+                    UPDATE hash_counts SET episodes = episodes - 1
+                    WHERE hash IN (SELECT DISTINCT hash FROM hashes WHERE episode_id = ?)
+                """, (row[0],))
+                conn.execute("DELETE FROM hash_counts WHERE episodes <= 0")
+                conn.execute("DELETE FROM hashes WHERE episode_id = ?", (row[0],))
+                conn.execute("DELETE FROM episodes WHERE id = ?", (row[0],))
+
+            cursor = conn.execute(
+                "INSERT INTO episodes (transcription_id, frames, added_at) VALUES (?, ?, ?)",
+                (transcription_id, frames, time.time())
+            )
+            episode_id = cursor.lastrowid
+
+            # Make room on full hashes by dropping their oldest episode
+            conn.execute("CREATE TEMP TABLE new_hashes (hash INTEGER PRIMARY KEY)")
+            conn.executemany(
+                "INSERT INTO new_hashes (hash) VALUES (?)",
+                ((int(h),) for h in np.unique(hashes))
+            )
+            conn.execute("CREATE TEMP TABLE evicted (hash INTEGER PRIMARY KEY, episode_id INTEGER NOT NULL)")
+            conn.execute("""
+                INSERT INTO evicted (hash, episode_id)
+                SELECT c.hash, (SELECT MIN(h.episode_id) FROM hashes h WHERE h.hash = c.hash)
+                FROM new_hashes n
+                CROSS JOIN hash_counts c ON c.hash = n.hash
+                WHERE c.episodes >= ?
+            """, (MAX_HASH_EPISODES,))
+            conn.execute("""
+                DELETE FROM hashes
+                WHERE hash IN (SELECT hash FROM evicted)
+                  AND episode_id = (SELECT e.episode_id FROM evicted e WHERE e.hash = hashes.hash)
+            """)
+            conn.execute("""
+                INSERT INTO hash_counts (hash, episodes)
+                SELECT hash, 1 FROM new_hashes WHERE hash NOT IN (SELECT hash FROM evicted)
+                ON CONFLICT (hash) DO UPDATE SET episodes = episodes + 1
+            """)
+            conn.execute("DROP TABLE new_hashes")
+            conn.execute("DROP TABLE evicted")
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO hashes (hash, episode_id, frame) VALUES (?, ?, ?)",
+                ((int(h), episode_id, int(o)) for h, o in zip(hashes, offsets))
+            )
+
+    def contains(self, transcription_id):
+        """Return whether an episode has been indexed."""
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM episodes WHERE transcription_id = ?", (transcription_id,)
+            ).fetchone()
+        return row is not None
+
+    def find_matches(self, hashes, offsets, exclude=None):
+        """
+        Find regions of a query that recur in indexed episodes.
+
+        Hits are counted per (episode, offset) in SQL; only the frames of the
+        strongest pairs are fetched and split into regions.
+
+        Args:
+            hashes (numpy.ndarray): Query peak-pair hashes
+            offsets (numpy.ndarray): Anchor frame of each query hash
+            exclude (str): Transcription ID to ignore (usually the query itself)
+
+        Returns:
+            list: Non-overlapping matches sorted by start, each a dict with
+            transcription_id, start, end, offset (seconds; source time is
+            query time plus offset) and hits
+        """
+        if len(hashes) == 0:
+            return []
+
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT id FROM episodes WHERE transcription_id = ?", (exclude,)
+            ).fetchone()
+            excluded_id = row[0] if row else None
+
+            conn.execute("CREATE TEMP TABLE query (hash INTEGER NOT NULL, frame INTEGER NOT NULL)")
+            conn.executemany(
+                "INSERT INTO query (hash, frame) VALUES (?, ?)",
+                ((int(h), int(o)) for h, o in zip(hashes, offsets))
+            )
+            conn.execute("""
+                CREATE TEMP TABLE candidates (
+                    id INTEGER PRIMARY KEY,
+                    episode_id INTEGER NOT NULL,
+                    delta INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                INSERT INTO candidates (episode_id, delta)
+                SELECT h.episode_id, h.frame - q.frame AS delta
+                FROM query q
+                CROSS JOIN hashes h ON h.hash = q.hash
+                WHERE h.episode_id IS NOT ?
+                GROUP BY h.episode_id, delta
+                HAVING COUNT(*) >= ?
+                ORDER BY COUNT(*) DESC
+                LIMIT ?
+            """, (excluded_id, MIN_DELTA_HITS, MAX_CANDIDATES))
+            conn.execute("CREATE INDEX temp.candidates_episode ON candidates (episode_id)")
+
+            # Tolerate one frame of jitter from re-encoding. CROSS JOIN keeps
+            # the planner from scanning the hash table for the few candidates.
+            rows = conn.execute("""
+                SELECT c.id, q.frame
+                FROM query q
+                CROSS JOIN hashes h ON h.hash = q.hash
+                CROSS JOIN candidates c ON c.episode_id = h.episode_id
+                    AND h.frame - q.frame BETWEEN c.delta - 1 AND c.delta + 1
+            """).fetchall()
+            candidates = {
+                candidate_id: (episode_id, delta, name)
+                for candidate_id, episode_id, delta, name in conn.execute("""
+                    SELECT c.id, c.episode_id, c.delta, e.transcription_id
+                    FROM candidates c JOIN episodes e ON e.id = c.episode_id
+                """)
+            }
+            conn.execute("DROP TABLE query")
+            conn.execute("DROP TABLE candidates")
+
+        if not rows:
+            return []
+
+        hits = np.array(rows, dtype=np.int64)
+        regions = find_regions(hits[:, 0], hits[:, 1])
+
+        # Strongest regions win where candidates overlap
+        accepted = []
+        for candidate_id, start, end, count in sorted(regions, key=lambda r: -r[3]):
+            if all(end < other[1] or start > other[2] for other in accepted):
+                accepted.append((candidate_id, start, end, count))
+
+        return [
+            {
+                'transcription_id': candidates[candidate_id][2],
+                'start': start * FRAME_SECONDS,
+                'end': (end + 1) * FRAME_SECONDS,
+                'offset': candidates[candidate_id][1] * FRAME_SECONDS,
+                'hits': count
+            }
+            for candidate_id, start, end, count in sorted(accepted, key=lambda r: r[1])
+        ]
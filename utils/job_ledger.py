@@ -0,0 +1,165 @@
+"""
+Filesystem-backed transcription job ledger
+
+Lets several nodes share one transcription queue without a broker. The ledger
+is a SQLite database on shared storage; a job is claimed by taking a lease in a
+single ``BEGIN IMMEDIATE`` transaction, so exactly one worker wins it. Workers
+renew their lease with heartbeats. If a worker crashes, its lease expires and
+another worker picks the job up again, up to a maximum number of attempts.
+
+The rollback journal is used rather than WAL, since WAL needs shared memory
+that network filesystems do not provide.
+"""
+
+import json
+import sqlite3
+import time
+
+from utils.database import connect
+
+
+class JobLedger:
+    """
+    Queue of transcription jobs with leases.
+
+    Args:
+        db_path (str): Path of the ledger database on shared storage
+        lease_seconds (float): How long a claim lasts without a heartbeat
+        max_attempts (int): Claims allowed before a job is marked failed
+    """
+
+    def __init__(self, db_path, lease_seconds=60, max_attempts=3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _connect(self, write=True):
+        """Open a connection in a transaction; writers take the write lock up front."""
+        return connect(self.db_path, begin="BEGIN IMMEDIATE" if write else "BEGIN", row_factory=sqlite3.Row)
+
+    def enqueue(self, job_id, filename, options=None):
+        """
+        Add a job, or reset an existing one to pending.
+
+        Args:
+            job_id (str): Job identifier (the transcription ID)
+            filename (str): Original filename of the upload
+            options (dict): Transcription options, e.g. ``{'progressive': True}``
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO jobs
+                    (job_id, filename, options, status, attempts, created_at, updated_at)
+                VALUES (?, ?, ?, 'pending', 0, ?, ?)
+            """, (job_id, filename, json.dumps(options or {}), now, now))
+
+    def claim(self, worker_id):
+        """
+        Lease the oldest pending job, or one whose lease has expired.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker
+
+        Returns:
+            dict: The claimed job, or None if there is nothing to do
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE jobs SET status = 'failed', error = 'Lease expired too many times', updated_at = ?
+                WHERE status = 'running' AND lease_expires < ? AND attempts >= ?
+            """, (now, now, self.max_attempts))
+
+            row = conn.execute("""
+                SELECT job_id FROM jobs
+                WHERE status = 'pending' OR (status = 'running' AND lease_expires < ?)
+                ORDER BY created_at
+                LIMIT 1
+            """, (now,)).fetchone()
+            if row is None:
+                return None
+
+            conn.execute("""
+                UPDATE jobs
+                SET status = 'running', stage = 'transcribing', worker_id = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE job_id = ?
+            """, (worker_id, now + self.lease_seconds, now, row['job_id']))
+
+            return self._row_to_job(
+                conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row['job_id'],)).fetchone()
+            )
+
+    def _update_owned(self, job_id, worker_id, assignments, params):
+        """Update a running job only if the worker still holds its lease."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (*params, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, worker_id):
+        """Extend a lease. Returns False if the worker no longer owns the job."""
+        return self._update_owned(
+            job_id, worker_id, "lease_expires = ?", (time.time() + self.lease_seconds,)
+        )
+
+    def set_stage(self, job_id, worker_id, stage):
+        """Record progress of a running job (e.g. "refining" after a draft)."""
+        return self._update_owned(job_id, worker_id, "stage = ?", (stage,))
+
+    def complete(self, job_id, worker_id):
+        """Mark a job done. Returns False if the worker no longer owns the job."""
+        return self._update_owned(
+            job_id, worker_id, "status = 'done', stage = NULL, lease_expires = NULL", ()
+        )
+
+    def fail(self, job_id, worker_id, error):
+        """Release a failed job for retry, or mark it failed after the last attempt."""
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    stage = NULL, worker_id = NULL, lease_expires = NULL, error = ?, updated_at = ?
+                WHERE job_id = ? AND worker_id = ? AND status = 'running'
+            """, (self.max_attempts, error, time.time(), job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def get(self, job_id):
+        """Return a job by ID, or None."""
+        with self._connect(write=False) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def counts(self):
+        """Return the number of jobs per status."""
+        with self._connect(write=False) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _row_to_job(row):
+        job = dict(row)
+        job['options'] = json.loads(job['options'])
+        return job
@@ -0,0 +1,336 @@
+"""
+Prometheus-style metrics and an opt-in sampling profiler
+
+Metrics are kept in-process and rendered in the Prometheus text exposition
+format, so ``/metrics`` can be scraped without extra dependencies.
+
+The sampling profiler periodically records the Python stack of every thread
+into a short ring buffer. When a request turns out to be slow, the samples
+taken during it are written out as collapsed stacks (one ``frame;frame;...
+count`` line per stack), ready for flamegraph tools such as ``flamegraph.pl``
+or speedscope. Profiles are process-wide: every thread sampled while the
+request ran is included, with the thread name as the root frame.
+"""
+
+import math
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as StackCounter, deque
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+# =============================================================================
+# Metric Types
+# =============================================================================
+
+def format_value(value):
+    """Format a sample value for the exposition format."""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label_value(value):
+    """Escape backslashes, double quotes and newlines in a label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    """Format a label dict as ``{a="1",b="2"}``."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items()) + '}'
+
+
+class Metric:
+    """Base class for labelled metrics."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        """Return the metric in the text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for suffix, labels, value in self._samples():
+                lines.append(f"{self.name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        """Mirror a total that is counted elsewhere (e.g. lane rejections)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield '_total', dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield '', dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self):
+        for key, (counts, total) in self._values.items():
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, counts):
+                yield '_bucket', dict(labels, le=format_value(bound)), count
+            yield '_sum', labels, total
+            yield '_count', labels, counts[-1]
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """Register a callable run before each render, e.g. to refresh queue gauges."""
+        self._collectors.append(collector)
+
+    def render(self):
+        """Return all metrics in the text exposition format."""
+        for collector in self._collectors:
+            collector()
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+# =============================================================================
+# Sampling Profiler
+# =============================================================================
+
+def stack_key(frame):
+    """Return a frame's stack as an ``inner...outer`` tuple of (code, line) pairs."""
+    entries = []
+    while frame is not None:
+        entries.append((frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    return tuple(entries)
+
+
+def collapse_stack(thread_name, key):
+    """Return a stack key as ``thread;outer;...;inner`` of ``function (file:line)`` entries."""
+    entries = [f"{code.co_name} ({os.path.basename(code.co_filename)}:{line})" for code, line in reversed(key)]
+    return ';'.join([thread_name] + entries)
+
+
+class SamplingProfiler:
+    """
+    Background stack sampler with a time-bounded ring buffer.
+
+    Each distinct stack is stored once; the buffer holds per-bucket sample
+    counts of stack IDs, so memory grows with the number of distinct stacks
+    rather than with the sampling rate. Stacks no bucket refers to any more
+    are forgotten when their last bucket expires.
+
+    Args:
+        interval (float): Seconds between samples
+        window (float): Seconds of samples kept in memory
+        output_dir (str): Directory profiles of slow requests are written to
+        bucket_seconds (float): Time resolution of the buffer
+    """
+
+    def __init__(self, interval=0.005, window=300, output_dir='profiles', bucket_seconds=0.5):
+        self.interval = interval
+        self.window = window
+        self.output_dir = output_dir
+        self.bucket_seconds = bucket_seconds
+        self._buckets = deque()  # (bucket start, Counter of stack ID -> samples)
+        self._stack_ids = {}  # (thread name, stack key) -> stack ID
+        self._stacks = {}  # stack ID -> (thread name, stack key)
+        self._references = StackCounter()  # stack ID -> buckets that count it
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling (no-op if already running)."""
+        if self.enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and drop buffered samples."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+        with self._lock:
+            self._buckets.clear()
+            self._stack_ids.clear()
+            self._stacks.clear()
+            self._references.clear()
+
+    def _intern(self, stack):
+        stack_id = self._stack_ids.get(stack)
+        if stack_id is None:
+            stack_id = self._next_id
+            self._next_id += 1
+            self._stack_ids[stack] = stack_id
+            self._stacks[stack_id] = stack
+        return stack_id
+
+    def _expire(self, now):
+        while self._buckets and self._buckets[0][0] < now - self.window:
+            _, counts = self._buckets.popleft()
+            for stack_id in counts:
+                self._references[stack_id] -= 1
+                if self._references[stack_id] <= 0:
+                    del self._references[stack_id]
+                    del self._stack_ids[self._stacks.pop(stack_id)]
+
+    def _run(self):
+        own_id = threading.get_ident()
+        thread_names = {}
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            frames = sys._current_frames()
+            if frames.keys() != thread_names.keys():
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            samples = [
+                (thread_names.get(thread_id, str(thread_id)), stack_key(frame))
+                for thread_id, frame in frames.items()
+                if thread_id != own_id
+            ]
+            del frames
+
+            bucket_start = now - now % self.bucket_seconds
+            with self._lock:
+                if not self._buckets or self._buckets[-1][0] != bucket_start:
+                    self._buckets.append((bucket_start, StackCounter()))
+                    self._expire(now)
+                counts = self._buckets[-1][1]
+                for stack in samples:
+                    stack_id = self._intern(stack)
+                    if stack_id not in counts:
+                        self._references[stack_id] += 1
+                    counts[stack_id] += 1
+
+    def collapsed(self, started, finished):
+        """
+        Aggregate samples taken between two ``time.monotonic()`` values.
+
+        Whole buckets are counted, so the range is widened to bucket bounds.
+
+        Returns:
+            collections.Counter: Sample count per collapsed stack
+        """
+        totals = StackCounter()
+        with self._lock:
+            for bucket_start, counts in self._buckets:
+                if bucket_start + self.bucket_seconds > started and bucket_start <= finished:
+                    totals.update(counts)
+            stacks = {stack_id: self._stacks[stack_id] for stack_id in totals}
+        return StackCounter({collapse_stack(*stacks[stack_id]): count for stack_id, count in totals.items()})
+
+    def dump(self, name, started, finished):
+        """
+        Write samples of a time range to ``<output_dir>/<timestamp>_<name>_<id>.folded``.
+
+        The random ID keeps profiles of the same route in the same second apart.
+
+        The profile covers every thread of the process during the range, not
+        only the request that triggered it; requests longer than the window
+        keep their last ``window`` seconds.
+
+        Returns:
+            str: Path of the written profile, or None if nothing was sampled
+        """
+        counts = self.collapsed(started, finished)
+        if not counts:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'request'
+        path = os.path.join(
+            self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{safe_name}_{uuid.uuid4().hex[:8]}.folded"
+        )
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
@@ -0,0 +1,277 @@
+"""
+Priority lanes with admission control
+
+Interactive requests (push-to-talk, voice commands, chat) share the process
+with long Whisper runs. Each lane has its own concurrency limit and queue, so
+a transcription backlog can never take the slots interactive work needs. When
+a lane's queue is full, new work is rejected with a retry hint instead of
+piling up behind it.
+
+Lanes can also carry a torch intra-op thread budget, applied in the worker
+thread when it enters the lane, so transcription leaves CPU cores free for
+interactive work.
+
+Slots can be held from threads (``slot``) or from coroutines (``async_slot``).
+Waiters of both kinds share one first-come, first-served queue; a released
+slot is handed straight to the next waiter, and a waiting coroutine is woken
+through its event loop, so it never blocks the loop or a pool thread.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+
+class LaneSaturated(Exception):
+    """Raised when a lane cannot admit more work."""
+
+    def __init__(self, lane, retry_after):
+        super().__init__(f"Lane '{lane}' is saturated, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class _ThreadWaiter:
+    """A thread waiting for a slot, woken through its own condition on the lane lock."""
+
+    def __init__(self, lock):
+        self.granted = False
+        self._condition = threading.Condition(lock)
+
+    def wait(self, timeout):
+        self._condition.wait(timeout)
+
+    def wake(self):
+        self._condition.notify()
+        return True
+
+
+class _AsyncWaiter:
+    """A coroutine waiting for a slot, woken through its event loop from any thread."""
+
+    def __init__(self):
+        self.granted = False
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+
+    def wake(self):
+        try:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+        except RuntimeError:  # The loop was closed while the coroutine waited
+            return False
+        return True
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Lane:
+    """
+    A bounded pool of execution slots with a bounded wait queue.
+
+    Args:
+        name (str): Lane name
+        concurrency (int): Work items allowed to run at once
+        max_queue (int): Work items allowed to wait for a slot
+        queue_timeout (float): Seconds an admitted item may wait, None for no limit
+        torch_threads (int): Torch intra-op threads for work in this lane, None to leave unchanged
+    """
+
+    def __init__(self, name, concurrency, max_queue, queue_timeout=None, torch_threads=None):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.torch_threads = torch_threads
+
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.average_duration = 1.0  # Moving average of slot hold time in seconds
+
+    @property
+    def waiting(self):
+        """Number of work items queued for a slot."""
+        return len(self._waiters)
+
+    def retry_after(self):
+        """Estimate seconds until a slot frees up for a new arrival."""
+        backlog = (self.waiting + 1) / self.concurrency
+        return max(1, int(round(backlog * self.average_duration)))
+
+    def _reject(self):
+        self.rejected += 1
+        raise LaneSaturated(self.name, self.retry_after())
+
+    def _enqueue(self, waiter, admit):
+        """Join the wait queue, or reject if it is full. Caller holds the lock."""
+        if admit and self.waiting >= self.max_queue:
+            self._reject()
+        self._waiters.append(waiter)
+
+    def _grant_waiters(self):
+        """Hand free slots to queued waiters in arrival order. Caller holds the lock."""
+        while self._waiters and self.active < self.concurrency:
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self.active += 1
+            if not waiter.wake():
+                self.active -= 1
+
+    def _timeout(self, admit):
+        return self.queue_timeout if admit else None
+
+    def acquire(self, admit=True):
+        """
+        Take a slot, blocking the calling thread until one is free.
+
+        Args:
+            admit (bool): Apply admission control; internal follow-up work
+                passes False to queue without limits
+
+        Raises:
+            LaneSaturated: If the queue is full or the wait times out
+        """
+        with self._lock:
+            if self.active < self.concurrency:
+                self.active += 1
+            else:
+                waiter = _ThreadWaiter(self._lock)
+                self._enqueue(waiter, admit)
+                timeout = self._timeout(admit)
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not waiter.granted:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._waiters.remove(waiter)
+                        self._reject()
+                    waiter.wait(remaining)
+
+        self.apply_thread_budget()
+
+    def apply_thread_budget(self):
+        """Apply the lane's torch thread budget to the calling thread."""
+        if self.torch_threads and torch is not None:
+            torch.set_num_threads(self.torch_threads)
+
+    async def acquire_async(self, admit=True):
+        """
+        Take a slot from a coroutine without blocking the event loop.
+
+        Raises:
+            LaneSaturated: If the queue is full or the wait times out
+        """
+        with self._lock:
+            if self.active < self.concurrency:
+                self.active += 1
+                return
+            waiter = _AsyncWaiter()
+            self._enqueue(waiter, admit)
+
+        try:
+            await asyncio.wait_for(waiter.future, self._timeout(admit))
+        except BaseException as e:
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            with self._lock:
+                if waiter.granted:
+                    if timed_out:
+                        return  # The slot arrived just as the wait timed out
+                    # Cancelled just as the slot was handed over: pass it on
+                    self.active -= 1
+                    self._grant_waiters()
+                else:
+                    self._waiters.remove(waiter)
+                    if timed_out:
+                        self._reject()
+            raise
+
+    def release(self, started=None):
+        """
+        Give back a slot.
+
+        Args:
+            started (float): ``time.monotonic()`` when the slot was taken, or
+                None for a slot given back unused, which is not counted
+                towards the average duration
+        """
+        with self._lock:
+            self.active -= 1
+            if started is not None:
+                self.completed += 1
+                self.average_duration = 0.8 * self.average_duration + 0.2 * (time.monotonic() - started)
+            self._grant_waiters()
+
+    @contextmanager
+    def slot(self, admit=True):
+        """Hold a slot in this lane for the duration of the block."""
+        self.acquire(admit)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+    @asynccontextmanager
+    async def async_slot(self, admit=True):
+        """Hold a slot in this lane for the duration of an ``async with`` block."""
+        await self.acquire_async(admit)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+    def stats(self):
+        """Return a snapshot of the lane's counters."""
+        with self._lock:
+            return {
+                'active': self.active,
+                'waiting': self.waiting,
+                'concurrency': self.concurrency,
+                'max_queue': self.max_queue,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'average_duration': round(self.average_duration, 3)
+            }
+
+
+class Scheduler:
+    """Collection of named lanes."""
+
+    def __init__(self, *lanes):
+        self.lanes = {lane.name: lane for lane in lanes}
+
+    def lane(self, name):
+        """Return the lane with the given name."""
+        return self.lanes[name]
+
+    def limit(self, lane_name):
+        """
+        Decorator running an async route handler inside a lane slot.
+
+        Args:
+            lane_name (str): Name of the lane to run in
+        """
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with self.lanes[lane_name].async_slot():
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Return counters for every lane."""
+        return {name: lane.stats() for name, lane in self.lanes.items()}
@@ -0,0 +1,85 @@
+"""
+Transcript segment helpers
+
+Pure functions over the segment format stored and served by the app (dicts
+with id, version, start, end, text and words). They have no dependency on
+Whisper, so they can be used and tested without loading a model.
+"""
+
+import bisect
+
+
+def build_segments(result, version=1):
+    """
+    Convert a Whisper result into the segment format stored and served by the app.
+
+    Args:
+        result (dict): Raw Whisper result
+        version (int): Version number assigned to every segment
+
+    Returns:
+        list: Segments with id, version, start, end, text and words
+    """
+    segments = []
+    for index, segment in enumerate(result["segments"]):
+        segments.append({
+            "id": index,
+            "version": version,
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": segment["text"].strip(),
+            "words": segment.get("words", [])
+        })
+    return segments
+
+
+def shift_segment(segment, offset):
+    """Return a copy of a segment with its and its words' times moved by offset seconds."""
+    return dict(
+        segment,
+        start=segment["start"] + offset,
+        end=segment["end"] + offset,
+        words=[
+            dict(word, start=word["start"] + offset, end=word["end"] + offset)
+            for word in segment.get("words", [])
+        ]
+    )
+
+
+def merge_refined_segments(draft_segments, refined_segments):
+    """
+    Project refined words onto the draft segment boundaries.
+
+    Draft start/end times are kept so bookmarks and on-screen segments stay
+    anchored; only segments whose text changed get a new version.
+
+    Args:
+        draft_segments (list): Segments from the draft pass
+        refined_segments (list): Segments from the refinement pass
+
+    Returns:
+        list: Draft segments with refined text and bumped versions
+    """
+    if not draft_segments:
+        return [dict(segment, version=2) for segment in refined_segments]
+
+    starts = [segment["start"] for segment in draft_segments]
+    buckets = [[] for _ in draft_segments]
+
+    for segment in refined_segments:
+        words = segment.get("words") or [
+            {"word": f" {segment['text']}", "start": segment["start"], "end": segment["end"]}
+        ]
+        for word in words:
+            midpoint = (word["start"] + word["end"]) / 2
+            index = max(bisect.bisect_right(starts, midpoint) - 1, 0)
+            buckets[index].append(word)
+
+    merged = []
+    for segment, words in zip(draft_segments, buckets):
+        text = "".join(word["word"] for word in words).strip()
+        if text == segment["text"]:
+            merged.append(segment)
+        else:
+            merged.append(dict(segment, text=text, words=words, version=segment["version"] + 1))
+    return merged
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Storage lifecycle manager for uploads and transcriptions
+
+Keeps ``uploads/`` and ``transcriptions/`` from growing without limit:
+
+- Files are laid out in sharded directories (``ab/cd/<id>_...``) so no single
+  directory collects every episode.
+- Access times are tracked in a small SQLite catalog.
+- An upload quota is enforced by evicting the least recently used audio whose
+  transcript is final.
+- Transcripts not read for a while are compressed with zstd and decompressed
+  transparently when read again.
+- Each transcript's status (e.g. a draft still being refined or a final one)
+  is kept next to its access record, so eviction can leave unfinished work alone.
+
+Run as a script to report on or reclaim space:
+
+    python -m utils.storage report
+    python -m utils.storage reclaim
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from utils.database import connect
+from utils.job_ledger import JobLedger
+
+
+TRANSCRIPT_SUFFIX = '_transcription.json'
+COMPRESSED_SUFFIX = '.zst'
+ACCESS_RESOLUTION = 60  # Seconds between recorded accesses of the same file
+STALE_TEMP_SECONDS = 3600  # Leftover temp files older than this are removed
+
+
+def shard_dir(root, file_id):
+    """Return the sharded directory for a file ID, e.g. ``root/ab/cd``."""
+    return os.path.join(root, file_id[:2], file_id[2:4])
+
+
+def is_unchanged(path, original):
+    """Return whether a file still is the version ``original`` (an ``os.stat`` result) describes."""
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return ((current.st_ino, current.st_size, current.st_mtime_ns)
+            == (original.st_ino, original.st_size, original.st_mtime_ns))
+
+
+class StorageManager:
+    """
+    Sharded file layout, access tracking, quotas and cold compression.
+
+    Args:
+        upload_folder (str): Root folder of uploaded audio
+        transcription_folder (str): Root folder of transcripts
+        db_path (str): Path of the SQLite access catalog
+        upload_quota_bytes (int): Audio size limit, 0 for no limit
+        cold_after_seconds (float): Idle time before a transcript is compressed
+        can_evict (callable): Optional ``file_id -> bool`` veto for eviction,
+            e.g. to protect audio with a transcription job still queued
+    """
+
+    def __init__(self, upload_folder, transcription_folder, db_path,
+                 upload_quota_bytes=0, cold_after_seconds=30 * 86400, can_evict=None):
+        self.upload_folder = upload_folder
+        self.transcription_folder = transcription_folder
+        self.db_path = db_path
+        self.upload_quota_bytes = upload_quota_bytes
+        self.cold_after_seconds = cold_after_seconds
+        self.can_evict = can_evict
+        self._last_recorded = {}
+
+        with connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    file_id TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS files_lru ON files (kind, last_access)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    file_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS transcripts_status ON transcripts (status)")
+
+    # -------------------------------------------------------------------------
+    # Layout
+    # -------------------------------------------------------------------------
+
+    def upload_path(self, file_id, filename):
+        """Return the sharded path for a new upload, creating its directory."""
+        directory = shard_dir(self.upload_folder, file_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{file_id}_{filename}")
+
+    def find_upload(self, file_id, filename):
+        """Return the path of an existing upload (sharded or legacy flat), or None."""
+        name = f"{file_id}_{filename}"
+        for path in (os.path.join(shard_dir(self.upload_folder, file_id), name),
+                     os.path.join(self.upload_folder, name)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def transcript_path(self, transcription_id):
+        """Return the sharded path of an uncompressed transcript, creating its directory."""
+        directory = shard_dir(self.transcription_folder, transcription_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{transcription_id}{TRANSCRIPT_SUFFIX}")
+
+    def _transcript_candidates(self, transcription_id):
+        name = f"{transcription_id}{TRANSCRIPT_SUFFIX}"
+        sharded = os.path.join(shard_dir(self.transcription_folder, transcription_id), name)
+        return [sharded, sharded + COMPRESSED_SUFFIX, os.path.join(self.transcription_folder, name)]
+
+    def has_transcript(self, transcription_id):
+        """Return whether a transcript exists in any form."""
+        return any(os.path.exists(path) for path in self._transcript_candidates(transcription_id))
+
+    # -------------------------------------------------------------------------
+    # Transcripts
+    # -------------------------------------------------------------------------
+
+    def write_transcript(self, transcription_id, text, status=None):
+        """
+        Write a transcript atomically and drop any stale compressed copy.
+
+        Args:
+            transcription_id (str): Transcript ID
+            text (str): Serialized transcript
+            status (str): Optional status to record, e.g. "refining" or "final"
+        """
+        path = self.transcript_path(transcription_id)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+        stale_paths = self._transcript_candidates(transcription_id)[1:]
+        for stale_path in stale_paths:
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+        with connect(self.db_path) as conn:
+            for stale_path in stale_paths:
+                self._forget(conn, stale_path)
+            if status is not None:
+                self._set_status(conn, transcription_id, status)
+        self.record(path, 'transcript', transcription_id, force=True)
+
+    def _read_transcript(self, transcription_id):
+        plain_path, compressed_path, legacy_path = self._transcript_candidates(transcription_id)
+
+        for path in (plain_path, legacy_path):
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return path, f.read()
+
+        if os.path.exists(compressed_path):
+            if zstandard is None:
+                raise RuntimeError("Transcript is zstd-compressed but zstandard is not installed")
+            with open(compressed_path, 'rb') as f:
+                return compressed_path, zstandard.ZstdDecompressor().decompress(f.read()).decode('utf-8')
+
+        return None, None
+
+    def read_transcript(self, transcription_id):
+        """
+        Read a transcript, decompressing a cold copy transparently.
+
+        Returns:
+            str: Serialized transcript, or None if missing
+        """
+        path, text = self._read_transcript(transcription_id)
+        if path is not None:
+            self.record(path, 'transcript', transcription_id)
+        return text
+
+    # -------------------------------------------------------------------------
+    # Transcript status
+    # -------------------------------------------------------------------------
+
+    def _set_status(self, conn, transcription_id, status):
+        conn.execute(
+            "INSERT OR REPLACE INTO transcripts (file_id, status, updated_at) VALUES (?, ?, ?)",
+            (transcription_id, status, time.time())
+        )
+
+    def transcript_status(self, transcription_id):
+        """
+        Return the recorded status of a transcript.
+
+        Transcripts written without a recorded status are read once (without
+        counting as an access): a bare segment list is final, a document
+        carries its own ``status``.
+
+        Returns:
+            str: Status such as "refining", "failed" or "final", or None if
+            there is no transcript
+        """
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT status FROM transcripts WHERE file_id = ?", (transcription_id,)
+            ).fetchone()
+        if row:
+            return row[0]
+
+        _, text = self._read_transcript(transcription_id)
+        if text is None:
+            return None
+        document = json.loads(text)
+        status = document.get('status', 'final') if isinstance(document, dict) else 'final'
+        with connect(self.db_path) as conn:
+            self._set_status(conn, transcription_id, status)
+        return status
+
+    def transcripts_with_status(self, status):
+        """Return the IDs of transcripts recorded with a status."""
+        with connect(self.db_path) as conn:
+            return [file_id for (file_id,) in conn.execute(
+                "SELECT file_id FROM transcripts WHERE status = ?", (status,)
+            )]
+
+    def transcript_counts(self):
+        """Return the number of transcripts per recorded status."""
+        with connect(self.db_path) as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM transcripts GROUP BY status"))
+
+    # -------------------------------------------------------------------------
+    # Access tracking
+    # -------------------------------------------------------------------------
+
+    def record(self, path, kind, file_id, force=False):
+        """
+        Record an access to a file.
+
+        Repeated accesses within ``ACCESS_RESOLUTION`` seconds are not written,
+        so polling a transcript does not turn every read into a catalog write.
+        """
+        now = time.time()
+        if not force and now - self._last_recorded.get(path, 0) < ACCESS_RESOLUTION:
+            return
+        self._last_recorded[path] = now
+
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, kind, file_id, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (path, kind, file_id, size, now)
+            )
+
+    def _forget(self, conn, path):
+        conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        self._last_recorded.pop(path, None)
+
+    def scan(self):
+        """
+        Catalog files on disk that are not tracked yet and forget vanished ones.
+
+        Untracked files get their modification time as last access.
+        """
+        with connect(self.db_path) as conn:
+            known = {path for (path,) in conn.execute("SELECT path FROM files")}
+
+            for kind, root in (('audio', self.upload_folder), ('transcript', self.transcription_folder)):
+                for directory, _, filenames in os.walk(root):
+                    for filename in filenames:
+                        path = os.path.join(directory, filename)
+                        if path in known:
+                            known.discard(path)
+                            continue
+                        if kind == 'transcript' and TRANSCRIPT_SUFFIX not in filename:
+                            continue
+                        if filename.endswith('.tmp'):
+                            continue
+                        stat = os.stat(path)
+                        file_id = filename.split('_', 1)[0]
+                        conn.execute(
+                            "INSERT INTO files (path, kind, file_id, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                            (path, kind, file_id, stat.st_size, stat.st_mtime)
+                        )
+
+            for path in known:
+                self._forget(conn, path)
+            conn.execute(
+                "DELETE FROM transcripts WHERE file_id NOT IN (SELECT file_id FROM files WHERE kind = 'transcript')"
+            )
+
+    # -------------------------------------------------------------------------
+    # Reclaiming space
+    # -------------------------------------------------------------------------
+
+    def enforce_quota(self):
+        """
+        Evict least recently used audio until uploads fit the quota.
+
+        Only audio whose transcript is final is evicted, so the episode can
+        still be read and searched after its audio is gone and drafts can
+        still be refined.
+
+        Returns:
+            list: Paths of evicted files
+        """
+        if not self.upload_quota_bytes:
+            return []
+
+        with connect(self.db_path) as conn:
+            (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM files WHERE kind = 'audio'").fetchone()
+            if total <= self.upload_quota_bytes:
+                return []
+
+            candidates = conn.execute(
+                "SELECT path, file_id, size FROM files WHERE kind = 'audio' ORDER BY last_access"
+            ).fetchall()
+
+        # Checked without holding the catalog open: status lookups may write to it
+        evicted = []
+        for path, file_id, size in candidates:
+            if total <= self.upload_quota_bytes:
+                break
+            if self.transcript_status(file_id) != 'final':
+                continue
+            if self.can_evict is not None and not self.can_evict(file_id):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            with connect(self.db_path) as conn:
+                self._forget(conn, path)
+            total -= size
+            evicted.append(path)
+
+        return evicted
+
+    def compress_cold_transcripts(self):
+        """
+        Compress final transcripts not read for ``cold_after_seconds`` with zstd.
+
+        Drafts are left alone. A transcript rewritten while it was being
+        compressed keeps its new version and the compressed copy is dropped.
+
+        Returns:
+            list: Paths of compressed transcripts (empty if zstandard is missing)
+        """
+        if zstandard is None:
+            return []
+
+        cutoff = time.time() - self.cold_after_seconds
+        compressor = zstandard.ZstdCompressor(level=10)
+        compressed = []
+
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT path, file_id, last_access FROM files "
+                "WHERE kind = 'transcript' AND last_access < ? AND path NOT LIKE ?",
+                (cutoff, f"%{COMPRESSED_SUFFIX}")
+            ).fetchall()
+
+        # Checked without holding the catalog open: status lookups may write to it
+        for path, file_id, last_access in rows:
+            if self.transcript_status(file_id) != 'final':
+                continue
+
+            try:
+                original = os.stat(path)
+                with open(path, 'rb') as f:
+                    data = compressor.compress(f.read())
+            except FileNotFoundError:
+                with connect(self.db_path) as conn:
+                    self._forget(conn, path)
+                continue
+
+            target_path = os.path.join(
+                shard_dir(self.transcription_folder, file_id),
+                os.path.basename(path) + COMPRESSED_SUFFIX
+            )
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            temp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, target_path)
+
+            if not is_unchanged(path, original):
+                try:
+                    os.remove(target_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            os.remove(path)
+
+            with connect(self.db_path) as conn:
+                self._forget(conn, path)
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, kind, file_id, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (target_path, 'transcript', file_id, len(data), last_access)
+                )
+            compressed.append(target_path)
+
+        return compressed
+
+    def remove_stale_temp_files(self):
+        """Remove temp files left behind by interrupted atomic writes."""
+        cutoff = time.time() - STALE_TEMP_SECONDS
+        removed = []
+        for root in (self.upload_folder, self.transcription_folder):
+            for directory, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.join(directory, filename)
+                    if filename.endswith('.tmp') and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed.append(path)
+        return removed
+
+    def reclaim(self):
+        """Run every space-reclaiming step and return what each one did."""
+        self.scan()
+        return {
+            'evicted': self.enforce_quota(),
+            'compressed': self.compress_cold_transcripts(),
+            'temp_removed': self.remove_stale_temp_files()
+        }
+
+    def report(self):
+        """Return file counts and sizes per kind plus quota usage."""
+        with connect(self.db_path) as conn:
+            rows = conn.execute("""
+                SELECT kind, COUNT(*), COALESCE(SUM(size), 0),
+                       SUM(CASE WHEN path LIKE ? THEN 1 ELSE 0 END), MIN(last_access)
+                FROM files GROUP BY kind
+            """, (f"%{COMPRESSED_SUFFIX}",)).fetchall()
+
+        report = {
+            kind: {'files': count, 'bytes': size, 'compressed': compressed, 'oldest_access': oldest}
+            for kind, count, size, compressed, oldest in rows
+        }
+        report['upload_quota_bytes'] = self.upload_quota_bytes
+        return report
+
+
+def format_size(size):
+    """Format a byte count for humans."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report on and reclaim upload and transcript storage')
+    parser.add_argument('command', choices=['report', 'reclaim'],
+                        help='report: show usage; reclaim: evict, compress and clean up')
+    parser.add_argument('--uploads', default=os.getenv('UPLOAD_FOLDER', 'uploads'),
+                        help='Upload folder (default: $UPLOAD_FOLDER or uploads)')
+    parser.add_argument('--transcriptions', default=os.getenv('TRANSCRIPTION_FOLDER', 'transcriptions'),
+                        help='Transcription folder (default: $TRANSCRIPTION_FOLDER or transcriptions)')
+    parser.add_argument('--quota', type=int, default=int(os.getenv('UPLOAD_QUOTA_BYTES', '0')),
+                        help='Upload quota in bytes, 0 for none (default: $UPLOAD_QUOTA_BYTES)')
+    parser.add_argument('--cold-days', type=float, default=float(os.getenv('TRANSCRIPT_COLD_DAYS', '30')),
+                        help='Days without access before a transcript is compressed (default: 30)')
+    parser.add_argument('--ledger', default=None,
+                        help='Transcription job ledger; audio of unfinished jobs is never evicted '
+                             '(default: $JOB_LEDGER_PATH or <transcriptions>/jobs.sqlite, if it exists)')
+
+    args = parser.parse_args()
+
+    ledger_path = args.ledger or os.getenv('JOB_LEDGER_PATH') or os.path.join(args.transcriptions, 'jobs.sqlite')
+    if args.ledger and not os.path.exists(ledger_path):
+        parser.error(f"Job ledger not found: {ledger_path}")
+    ledger = JobLedger(ledger_path) if os.path.exists(ledger_path) else None
+
+    def can_evict(file_id):
+        job = ledger.get(file_id) if ledger is not None else None
+        return job is None or job['status'] == 'done'
+
+    storage = StorageManager(
+        args.uploads,
+        args.transcriptions,
+        os.getenv('STORAGE_DB') or os.path.join(args.transcriptions, 'storage.sqlite'),
+        upload_quota_bytes=args.quota,
+        cold_after_seconds=args.cold_days * 86400,
+        can_evict=can_evict
+    )
+
+    if args.command == 'reclaim':
+        if zstandard is None:
+            print("Note: zstandard is not installed, cold transcripts will not be compressed")
+        result = storage.reclaim()
+        print(f"Evicted audio files: {len(result['evicted'])}")
+        print(f"Compressed transcripts: {len(result['compressed'])}")
+        print(f"Removed temp files: {len(result['temp_removed'])}")
+    else:
+        storage.scan()
+
+    report = storage.report()
+    print("Storage usage")
+    print("=" * 40)
+    for kind in ('audio', 'transcript'):
+        stats = report.get(kind, {'files': 0, 'bytes': 0, 'compressed': 0})
+        print(f"{kind.capitalize():<12} {stats['files']:>7} files  {format_size(stats['bytes']):>10}"
+              f"  ({stats['compressed']} compressed)")
+    if report['upload_quota_bytes']:
+        used = report.get('audio', {}).get('bytes', 0)
+        print(f"Upload quota: {format_size(used)} of {format_size(report['upload_quota_bytes'])}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
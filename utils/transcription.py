@@ -0,0 +1,199 @@
+"""
+Whisper transcription pipeline shared by the web app, workers and benchmarks
+
+Importing this module has no side effects: models are loaded on first use and
+timings are reported through optional callbacks, so benchmarks drive exactly
+the code path ``/transcribe`` and the workers use without starting the app.
+
+Audio heard in earlier episodes (found with a fingerprint index) is filled
+in from their stored transcripts; only the novel parts are sent to Whisper.
+"""
+
+import threading
+import time
+
+import whisper
+
+from utils.fingerprint import fingerprint_audio
+from utils.segments import build_segments, shift_segment
+
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+SPLICE_TOLERANCE = 0.5  # Seconds a reused segment may overhang a matched region
+MIN_NOVEL_SECONDS = 0.5  # Shorter gaps between reused regions are not transcribed
+
+
+class Transcriber:
+    """
+    Loads Whisper models on demand and transcribes decoded audio or files.
+
+    Each model is guarded by its own lock: decoding installs kv-cache hooks on
+    the model, so concurrent calls on one instance are unsafe.
+
+    Args:
+        fingerprint_index (FingerprintIndex): Index of earlier episodes, or
+            None to send all audio to Whisper
+        load_segments (callable): ``transcription_id -> segments`` of a stored
+            transcript (or None), used to reuse matched regions
+        on_whisper (callable): Optional ``(model_size, elapsed, audio_seconds)``
+            hook after each Whisper call; audio_seconds is None for file input
+        on_decode (callable): Optional ``elapsed`` hook after each audio decode
+        device (str): Torch device for loaded models (default: Whisper's choice)
+    """
+
+    def __init__(self, fingerprint_index=None, load_segments=None, on_whisper=None,
+                 on_decode=None, device=None):
+        self.fingerprint_index = fingerprint_index
+        self.load_segments = load_segments
+        self.on_whisper = on_whisper
+        self.on_decode = on_decode
+        self.device = device
+        self._models = {}
+        self._locks = {}
+        self._models_lock = threading.Lock()
+
+    def add_model(self, model_size, model):
+        """Register an already loaded model under its size."""
+        with self._models_lock:
+            self._models[model_size] = model
+            self._locks.setdefault(model_size, threading.Lock())
+
+    def get_model(self, model_size):
+        """
+        Return the Whisper model of the given size and its lock, loading it on first use.
+
+        Args:
+            model_size (str): Whisper model size (e.g. "tiny", "base")
+
+        Returns:
+            tuple: (model, lock)
+        """
+        with self._models_lock:
+            if model_size not in self._models:
+                self._models[model_size] = whisper.load_model(model_size, device=self.device)
+                self._locks[model_size] = threading.Lock()
+            return self._models[model_size], self._locks[model_size]
+
+    def load_pcm(self, file_path):
+        """Decode an audio file to 16kHz mono float samples for Whisper and fingerprinting."""
+        started = time.monotonic()
+        audio = whisper.load_audio(file_path)
+        if self.on_decode is not None:
+            self.on_decode(time.monotonic() - started)
+        return audio
+
+    def run_whisper(self, model_size, audio, **options):
+        """
+        Transcribe audio with the Whisper model of the given size.
+
+        Args:
+            model_size (str): Whisper model size
+            audio (str or numpy.ndarray): File path or 16kHz mono samples
+            **options: Extra arguments for ``model.transcribe``
+
+        Returns:
+            dict: Raw Whisper result
+        """
+        whisper_model, lock = self.get_model(model_size)
+        with lock:
+            started = time.monotonic()
+            result = whisper_model.transcribe(audio, **options)
+            elapsed = time.monotonic() - started
+
+        if self.on_whisper is not None:
+            audio_seconds = None if isinstance(audio, str) else len(audio) / SAMPLE_RATE
+            self.on_whisper(model_size, elapsed, audio_seconds)
+        return result
+
+    def splice_known_segments(self, matches, covered):
+        """
+        Collect stored segments for regions matched in earlier episodes.
+
+        Args:
+            matches (list): Matches from ``FingerprintIndex.find_matches``
+            covered (list): (start, end) intervals already filled, extended in place
+
+        Returns:
+            list: Segments shifted onto the timeline of the current episode
+        """
+        spliced = []
+
+        for match in matches:
+            source_segments = self.load_segments(match['transcription_id']) if self.load_segments else None
+            if not source_segments:
+                continue
+
+            region = []
+            for segment in source_segments:
+                start = segment["start"] - match['offset']
+                end = segment["end"] - match['offset']
+                if start < match['start'] - SPLICE_TOLERANCE or end > match['end'] + SPLICE_TOLERANCE:
+                    continue
+                if any(start < covered_end and end > covered_start for covered_start, covered_end in covered):
+                    continue
+                region.append(shift_segment(segment, -match['offset']))
+
+            if region:
+                covered.append((region[0]["start"], region[-1]["end"]))
+                spliced.extend(region)
+
+        return spliced
+
+    def transcribe_audio(self, model_size, transcription_id, audio, final=True, **options):
+        """
+        Transcribe decoded audio, reusing stored segments for audio heard in earlier episodes.
+
+        When ``final`` is set, the episode's fingerprints are added to the
+        index afterwards so later episodes can reuse this transcript.
+
+        Args:
+            model_size (str): Whisper model size
+            transcription_id (str): ID the transcription is stored under
+            audio (numpy.ndarray): 16kHz mono float samples
+            final (bool): Whether this pass produces the final transcript
+            **options: Extra arguments for ``model.transcribe``; word
+                timestamps are on unless disabled
+
+        Returns:
+            list: Segments sorted by start time (version 1)
+        """
+        options.setdefault('word_timestamps', True)
+
+        if self.fingerprint_index is None:
+            return build_segments(self.run_whisper(model_size, audio, **options))
+
+        duration = len(audio) / SAMPLE_RATE
+        hashes, offsets = fingerprint_audio(audio)
+
+        covered = []
+        matches = self.fingerprint_index.find_matches(hashes, offsets, exclude=transcription_id)
+        segments = self.splice_known_segments(matches, covered)
+
+        # Transcribe the gaps between reused regions
+        position = 0.0
+        for covered_start, covered_end in sorted(covered) + [(duration, duration)]:
+            if covered_start - position >= MIN_NOVEL_SECONDS:
+                start_sample = int(position * SAMPLE_RATE)
+                end_sample = int(covered_start * SAMPLE_RATE)
+                result = self.run_whisper(model_size, audio[start_sample:end_sample], **options)
+                segments.extend(shift_segment(segment, position) for segment in build_segments(result))
+            position = max(position, covered_end)
+
+        segments.sort(key=lambda segment: segment["start"])
+        for index, segment in enumerate(segments):
+            segment["id"] = index
+            segment["version"] = 1
+
+        if final:
+            self.fingerprint_index.add(transcription_id, hashes, offsets)
+
+        return segments
+
+    def transcribe_file(self, model_size, transcription_id, file_path, final=True):
+        """
+        Decode and transcribe an audio file; see ``transcribe_audio``.
+
+        Returns:
+            list: Segments sorted by start time (version 1)
+        """
+        return self.transcribe_audio(model_size, transcription_id, self.load_pcm(file_path), final=final)